@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import shutil
 import sys
 import webbrowser
@@ -12,7 +11,7 @@ from typing import Annotated, cast
 import typer
 
 from .config import get_data_root
-from .project import ProjectManifest, ProjectStore, project_id_for_path
+from .project import ProjectManifest, ProjectStore, load_json, project_id_for_path
 from .processing import process_inputs
 from .server import create_app, run_server
 
@@ -34,7 +33,8 @@ def _list_projects() -> list[ProjectManifest]:
     manifests: list[ProjectManifest] = []
     for manifest_path in get_data_root().glob("*/manifest.json"):
         try:
-            raw_obj = cast(object, json.loads(manifest_path.read_text(encoding="utf-8")))
+            data = manifest_path.read_bytes()
+            raw_obj = load_json(data)
         except Exception:
             continue
         if not isinstance(raw_obj, dict):
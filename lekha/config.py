@@ -7,15 +7,29 @@ import platform
 from pathlib import Path
 
 APP_NAME = "lekha"
+DEFAULT_PNG_COMPRESS_LEVEL = 1
 
 
 def get_data_root() -> Path:
-    """Return the base directory for storing project data."""
-    system = platform.system()
-    if system == "Windows":
-        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    """Return the base directory for storing project data, honoring ``LEKHA_DATA_ROOT``."""
+    override = os.environ.get("LEKHA_DATA_ROOT")
+    if override:
+        root = Path(override)
+    elif platform.system() == "Windows":
+        root = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")) / APP_NAME
     else:
-        base = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
-    root = base / APP_NAME
+        root = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share")) / APP_NAME
     root.mkdir(parents=True, exist_ok=True)
     return root
+
+
+def get_png_compress_level() -> int:
+    """Return the zlib level used for segment PNGs, honoring ``LEKHA_PNG_LEVEL``."""
+    raw = os.environ.get("LEKHA_PNG_LEVEL")
+    if raw is None:
+        return DEFAULT_PNG_COMPRESS_LEVEL
+    try:
+        level = int(raw)
+    except ValueError:
+        return DEFAULT_PNG_COMPRESS_LEVEL
+    return min(max(level, 0), 9)
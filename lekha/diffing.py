@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import sys
+from array import array
 from dataclasses import dataclass, field
-from difflib import SequenceMatcher
+from functools import cached_property, lru_cache
 from collections.abc import Mapping, Sequence
 
+Opcode = tuple[str, int, int, int, int]
+
+# Base sequences up to this many tokens fit a single machine word for the bit-parallel LCS kernel.
+BITPARALLEL_MAX_TOKENS = 64
+
+# Number of (base words, model text) diffs remembered across calls, e.g. when a page is reprocessed.
+DIFF_CACHE_SIZE = 1024
+
 
 @dataclass
 class BaseToken:
@@ -21,76 +31,282 @@ class WordConsensus:
     word_index: int
     alternatives: dict[str, str] = field(default_factory=dict)
 
-    @property
+    # Both views are read on every render and alternatives are final once consensus is computed,
+    # so they are computed on first access and cached on the instance.
+    @cached_property
     def has_conflict(self) -> bool:
         return any(alt and alt != self.base for alt in self.alternatives.values())
 
-    @property
+    @cached_property
     def display_text(self) -> str:
-        alts: list[str] = [self.base]
+        # A dict keeps first-seen order and dedups in the same pass.
+        unique: dict[str, None] = {self.base: None}
         for alt in self.alternatives.values():
-            if alt and alt not in alts:
-                alts.append(alt)
-        # Filter duplicates of base
-        unique: list[str] = []
-        for alt in alts:
-            if alt not in unique:
-                unique.append(alt)
-        if len(unique) <= 1:
-            return unique[0] if unique else self.base
+            if alt:
+                unique[alt] = None
+        if len(unique) == 1:
+            return self.base
         return "[" + "/".join(unique) + "]"
 
 
+@dataclass
+class ConsensusTable:
+    """Column-oriented consensus for a base token sequence, one row per token."""
+
+    bases: list[str]
+    line_indices: array[int]
+    word_indices: array[int]
+    # One column per model that disagreed somewhere; None marks rows where it agreed with the base.
+    alternatives_by_model: dict[str, list[str | None]] = field(default_factory=dict)
+
+    @classmethod
+    def from_tokens(cls, base_tokens: Sequence[BaseToken]) -> ConsensusTable:
+        return cls(
+            bases=[sys.intern(token.text) for token in base_tokens],
+            line_indices=array("i", [token.line_index for token in base_tokens]),
+            word_indices=array("i", [token.word_index for token in base_tokens]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.bases)
+
+    def alternatives_for(self, index: int) -> dict[str, str]:
+        return {
+            model_name: alternative
+            for model_name, column in self.alternatives_by_model.items()
+            if (alternative := column[index]) is not None
+        }
+
+    def has_conflict(self, index: int) -> bool:
+        base = self.bases[index]
+        for column in self.alternatives_by_model.values():
+            alt = column[index]
+            if alt and alt != base:
+                return True
+        return False
+
+    def to_records(self) -> list[WordConsensus]:
+        return [
+            WordConsensus(
+                base=self.bases[index],
+                line_index=self.line_indices[index],
+                word_index=self.word_indices[index],
+                alternatives=self.alternatives_for(index),
+            )
+            for index in range(len(self.bases))
+        ]
+
+
 def tokenize(text: str) -> list[str]:
-    return text.split()
+    # str.split() already scans in C and knows every Unicode whitespace; a Python-level scanner is slower.
+    # Interning makes repeated words share one object, so diff comparisons hit the identity fast path.
+    return [sys.intern(token) for token in text.split()]
 
 
 def compute_word_consensus(
     base_tokens: Sequence[BaseToken],
     model_texts: Mapping[str, str],
 ) -> list[WordConsensus]:
-    consensus = [
-        WordConsensus(base=token.text, line_index=token.line_index, word_index=token.word_index) for token in base_tokens
-    ]
-    base_words = [token.text for token in base_tokens]
+    return compute_consensus_table(base_tokens, model_texts).to_records()
+
+
+def compute_consensus_table(
+    base_tokens: Sequence[BaseToken],
+    model_texts: Mapping[str, str],
+) -> ConsensusTable:
+    table = ConsensusTable.from_tokens(base_tokens)
+    base_key = tuple(table.bases)
+    size = len(table)
     for model_name, text in model_texts.items():
         if not text:
             continue
-        tokens = tokenize(text)
-        matcher = SequenceMatcher(None, base_words, tokens, autojunk=False)
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        tokens, opcodes = _diff_model_text(base_key, text)
+        if not opcodes or not size:
+            continue
+        column: list[str | None] = [None] * size
+        for tag, i1, i2, j1, j2 in opcodes:
             if tag == "equal":
                 continue
             if tag == "replace":
                 span = min(i2 - i1, j2 - j1)
                 for offset in range(span):
-                    base_idx = i1 + offset
-                    alt = tokens[j1 + offset]
-                    consensus[base_idx].alternatives[model_name] = alt
+                    column[i1 + offset] = tokens[j1 + offset]
                 if (j2 - j1) > span and i2 - 1 >= i1:
                     trailing_tokens = tokens[j1 + span : j2]
                     base_idx = max(i1, i2 - 1)
-                    joined = " ".join(trailing_tokens)
-                    _append_alternative(consensus[base_idx], model_name, joined)
+                    _append_alternative(column, base_idx, " ".join(trailing_tokens))
                 if (i2 - i1) > span:
                     for base_idx in range(i1 + span, i2):
-                        consensus[base_idx].alternatives[model_name] = ""
+                        column[base_idx] = ""
             elif tag == "delete":
                 for base_idx in range(i1, i2):
-                    consensus[base_idx].alternatives[model_name] = ""
+                    column[base_idx] = ""
             elif tag == "insert":
-                # Only append insertion if we have base tokens to attach it to
-                if consensus:
-                    target_idx = max(i1 - 1, 0)
-                    insertion = " ".join(tokens[j1:j2])
-                    _append_alternative(consensus[target_idx], model_name, insertion)
-    return consensus
+                # Attach the insertion to the preceding base token (the table is non-empty here)
+                target_idx = max(i1 - 1, 0)
+                _append_alternative(column, target_idx, " ".join(tokens[j1:j2]))
+        if any(value is not None for value in column):
+            table.alternatives_by_model[model_name] = column
+    return table
 
 
-def _append_alternative(entry: WordConsensus, model_name: str, text: str) -> None:
+def _append_alternative(column: list[str | None], index: int, text: str) -> None:
     if not text:
         return
-    if model_name in entry.alternatives and entry.alternatives[model_name]:
-        entry.alternatives[model_name] = " ".join([entry.alternatives[model_name], text])
-    else:
-        entry.alternatives[model_name] = text
+    existing = column[index]
+    column[index] = f"{existing} {text}" if existing else text
+
+
+@lru_cache(maxsize=DIFF_CACHE_SIZE)
+def _diff_model_text(base_words: tuple[str, ...], text: str) -> tuple[tuple[str, ...], tuple[Opcode, ...]]:
+    """Tokenize a model's text and diff it against the base words, memoized on both."""
+    tokens = tuple(tokenize(text))
+    if tokens == base_words:
+        # A model that agrees with the base contributes no alternatives; skip the diff entirely.
+        return tokens, ()
+    return tokens, tuple(_diff_opcodes(base_words, tokens))
+
+
+def _diff_opcodes(a: Sequence[str], b: Sequence[str]) -> list[Opcode]:
+    """Diff two token sequences into SequenceMatcher-style opcodes, running a kernel only on the differing core."""
+    n, m = len(a), len(b)
+    # OCR outputs mostly agree, so trimming the shared ends leaves a tiny core for the kernel.
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+    blocks: list[tuple[int, int, int]] = []
+    if prefix:
+        blocks.append((0, 0, prefix))
+    if prefix + suffix < n and prefix + suffix < m:
+        for i, j, size in _matching_blocks(a[prefix : n - suffix], b[prefix : m - suffix]):
+            blocks.append((i + prefix, j + prefix, size))
+    if suffix:
+        blocks.append((n - suffix, m - suffix, suffix))
+    return _opcodes_from_blocks(n, m, blocks)
+
+
+def _matching_blocks(a: Sequence[str], b: Sequence[str]) -> list[tuple[int, int, int]]:
+    """Return matching blocks from the bit-parallel kernel when ``a`` fits a word, else from Myers."""
+    if len(a) <= BITPARALLEL_MAX_TOKENS:
+        return _bitparallel_matching_blocks(a, b)
+    return _myers_matching_blocks(a, b)
+
+
+def _opcodes_from_blocks(n: int, m: int, blocks: list[tuple[int, int, int]]) -> list[Opcode]:
+    """Turn ordered matching blocks into opcodes the way SequenceMatcher.get_opcodes does."""
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for block_i, block_j, size in [*blocks, (n, m, 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(("delete", i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(("insert", i, block_i, j, block_j))
+        i, j = block_i + size, block_j + size
+        if size:
+            opcodes.append(("equal", block_i, i, block_j, j))
+    return opcodes
+
+
+def _blocks_from_matches(matches: list[tuple[int, int]]) -> list[tuple[int, int, int]]:
+    """Merge ascending matched index pairs into maximal (i, j, size) runs."""
+    blocks: list[tuple[int, int, int]] = []
+    for i, j in matches:
+        if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+            start_i, start_j, size = blocks[-1]
+            blocks[-1] = (start_i, start_j, size + 1)
+        else:
+            blocks.append((i, j, 1))
+    return blocks
+
+
+def _bitparallel_matching_blocks(a: Sequence[str], b: Sequence[str]) -> list[tuple[int, int, int]]:
+    """Return matching blocks along a longest common subsequence using Hyyrö's bit-parallel LCS."""
+    n = len(a)
+    if not n or not b:
+        return []
+    # eq[token] has bit i set wherever a[i] == token.
+    eq: dict[str, int] = {}
+    for index, token in enumerate(a):
+        eq[token] = eq.get(token, 0) | (1 << index)
+    mask = (1 << n) - 1
+    v = mask
+    # rows[j] has bit i set where the LCS table steps up between a[:i] and a[:i + 1] against b[:j].
+    rows = [0]
+    for token in b:
+        u = v & eq.get(token, 0)
+        v = ((v + u) | (v - u)) & mask
+        rows.append(~v & mask)
+
+    matches: list[tuple[int, int]] = []
+    i, j = n, len(b)
+    while i and j:
+        if a[i - 1] == b[j - 1]:
+            i -= 1
+            j -= 1
+            matches.append((i, j))
+        elif (rows[j] >> (i - 1)) & 1:
+            j -= 1
+        else:
+            i -= 1
+    matches.reverse()
+    return _blocks_from_matches(matches)
+
+
+def _myers_matching_blocks(a: Sequence[str], b: Sequence[str]) -> list[tuple[int, int, int]]:
+    """Return maximal runs of matching tokens (i, j, size) along a shortest edit script."""
+    n, m = len(a), len(b)
+    if not n or not m:
+        return []
+    offset = n + m
+    v = [0] * (2 * offset + 2)
+    # trace[d] holds the furthest x per diagonal k in [-d, d] before round d, indexed by k + d.
+    trace: list[list[int]] = []
+    x = y = 0
+    for d in range(offset + 1):
+        low, high = offset - d, offset + d
+        trace.append(v[low : high + 1])
+        # Iterate over v slots directly; diagonal k lives at slot offset + k.
+        for slot in range(low, high + 1, 2):
+            if slot == low or (slot != high and v[slot - 1] < v[slot + 1]):
+                x = v[slot + 1]
+            else:
+                x = v[slot - 1] + 1
+            y = x - slot + offset
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[slot] = x
+            if x >= n and y >= m:
+                break
+        else:
+            continue
+        break
+
+    # Walk the trace backwards from (n, m), collecting the diagonal (matching) moves.
+    matches: list[tuple[int, int]] = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d] < previous[k + 1 + d]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = previous[prev_k + d]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((x, y))
+    matches.reverse()
+    return _blocks_from_matches(matches)
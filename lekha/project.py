@@ -4,10 +4,17 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import dataclass, field
+import os
+import tempfile
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import cast
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 from .config import get_data_root
 
 JSONPrimitive = str | int | float | bool | None
@@ -15,9 +22,51 @@ JSONValue = JSONPrimitive | dict[str, "JSONValue"] | list["JSONValue"]
 JSONDict = dict[str, JSONValue]
 JSONList = list[JSONValue]
 
+# Fold the append-only edits log back into edits.json once it grows past this size.
+EDITS_LOG_COMPACT_BYTES = 1024 * 1024
+
+
+def load_json(data: bytes) -> JSONValue:
+    """Parse JSON bytes, with orjson when it is installed."""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers see the same errors either way.
+    if orjson is not None:
+        return cast(JSONValue, orjson.loads(data))
+    return cast(JSONValue, json.loads(data))
+
+
+def _json_dumps(value: object, *, indent: bool = True) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(value, indent=2 if indent else None).encode("utf-8")
+
+
+class _SlugTable(dict[int, int]):
+    """str.translate table that maps each code point to itself or to "-", filling itself in on first sight."""
+
+    def __missing__(self, codepoint: int) -> int:
+        char = chr(codepoint)
+        mapped = codepoint if char.isalnum() or char in "-_" else ord("-")
+        self[codepoint] = mapped
+        return mapped
+
+
+_SLUG_TABLE = _SlugTable()
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write to a sibling temp file and rename it over ``path``, so readers never see a half-written file."""
+    fh = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with fh:
+            _ = fh.write(data)
+        os.replace(fh.name, path)
+    except BaseException:
+        Path(fh.name).unlink(missing_ok=True)
+        raise
+
 
 def slugify(name: str) -> str:
-    normalized = "".join(ch if ch.isalnum() or ch in "-_" else "-" for ch in name.lower())
+    normalized = name.lower().translate(_SLUG_TABLE)
     return "-".join(filter(None, normalized.split("-")))
 
 
@@ -28,7 +77,7 @@ def project_id_for_path(path: Path) -> str:
     return f"{slug}-{digest}" if slug else digest
 
 
-@dataclass
+@dataclass(slots=True)
 class Segment:
     segment_id: str
     view: str  # "line" or "word"
@@ -42,6 +91,15 @@ class Segment:
     has_conflict: bool
     alternatives: dict[str, str] = field(default_factory=dict)
     word_ids: list[str] = field(default_factory=list)
+    # Reading-order key, materialized once so sorts can use operator.attrgetter. Not persisted.
+    sort_key: tuple[int, int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.sort_key = (self.page_index, self.line_index, self.word_index if self.word_index is not None else -1)
+
+
+# Persisted Segment fields, in declaration order; derived fields like sort_key are left out.
+_SEGMENT_FIELDS = tuple(segment_field.name for segment_field in fields(Segment) if segment_field.init)
 
 
 @dataclass
@@ -63,8 +121,11 @@ class ProjectStore:
     meta_path: Path
     segments_path: Path
     edits_path: Path
+    edits_log_path: Path
     state_path: Path
     master_path: Path
+    _last_written_edits: dict[str, str] | None
+    _last_written_state: dict[str, str] | None
 
     def __init__(self, project_id: str) -> None:
         self.project_id = project_id
@@ -77,17 +138,20 @@ class ProjectStore:
         self.meta_path = self.root / "manifest.json"
         self.segments_path = self.root / "segments.json"
         self.edits_path = self.root / "edits.json"
+        self.edits_log_path = self.root / "edits.log"
         self.state_path = self.root / "state.json"
         self.master_path = self.root / "master.txt"
+        # Snapshots of what this store last wrote, so no-op writes can skip the disk.
+        self._last_written_edits = None
+        self._last_written_state = None
 
     def write_manifest(self, manifest: ProjectManifest) -> None:
-        with self.meta_path.open("w", encoding="utf-8") as fh:
-            json.dump(manifest.__dict__, fh, indent=2)
+        _atomic_write_bytes(self.meta_path, _json_dumps(manifest.__dict__))
 
     def load_manifest(self) -> ProjectManifest | None:
         if not self.meta_path.exists():
             return None
-        raw_value = cast(JSONValue, json.loads(self.meta_path.read_text(encoding="utf-8")))
+        raw_value = load_json(self.meta_path.read_bytes())
         if not isinstance(raw_value, dict):
             raise ValueError("Invalid manifest format.")
         project_id = _require_str(raw_value.get("project_id"), "project_id")
@@ -105,14 +169,14 @@ class ProjectStore:
         )
 
     def write_segments(self, segments: list[Segment]) -> None:
-        payload = [segment.__dict__ for segment in segments]
-        with self.segments_path.open("w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2)
+        payload = [{name: getattr(segment, name) for name in _SEGMENT_FIELDS} for segment in segments]
+        # segments.json is the bulkiest file and only ever machine-read, so skip the indentation.
+        _atomic_write_bytes(self.segments_path, _json_dumps(payload, indent=False))
 
     def load_segments(self) -> list[Segment]:
         if not self.segments_path.exists():
             return []
-        raw_value = cast(JSONValue, json.loads(self.segments_path.read_text(encoding="utf-8")))
+        raw_value = load_json(self.segments_path.read_bytes())
         if not isinstance(raw_value, list):
             raise ValueError("Invalid segments data.")
         segments: list[Segment] = []
@@ -123,25 +187,76 @@ class ProjectStore:
         return segments
 
     def read_edits(self) -> dict[str, str]:
-        if not self.edits_path.exists():
-            return {}
-        raw_value = cast(JSONValue, json.loads(self.edits_path.read_text(encoding="utf-8")))
-        if not isinstance(raw_value, dict):
-            raise ValueError("Invalid edits data.")
         edits: dict[str, str] = {}
-        for key, value in raw_value.items():
-            if isinstance(value, str):
-                edits[key] = value
+        if self.edits_path.exists():
+            raw_value = load_json(self.edits_path.read_bytes())
+            if not isinstance(raw_value, dict):
+                raise ValueError("Invalid edits data.")
+            for key, value in raw_value.items():
+                if isinstance(value, str):
+                    edits[key] = value
+        self._replay_edits_log(edits)
         return edits
 
+    def _replay_edits_log(self, edits: dict[str, str]) -> None:
+        if not self.edits_log_path.exists():
+            return
+        with self.edits_log_path.open("rb") as fh:
+            for line in fh:
+                try:
+                    entry = load_json(line)
+                except ValueError:
+                    # A torn line from an interrupted append, possibly cut mid-character; the rest of the log is intact.
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                segment_id = entry.get("id")
+                text = entry.get("text")
+                if isinstance(segment_id, str) and isinstance(text, str):
+                    edits[segment_id] = text
+
     def write_edits(self, edits: dict[str, str]) -> None:
-        with self.edits_path.open("w", encoding="utf-8") as fh:
-            json.dump(edits, fh, indent=2)
+        """Write a full edits snapshot, superseding anything in the edits log."""
+        if edits == self._last_written_edits:
+            return
+        _atomic_write_bytes(self.edits_path, _json_dumps(edits))
+        self.edits_log_path.unlink(missing_ok=True)
+        self._last_written_edits = dict(edits)
+
+    def append_edits(self, changes: dict[str, str]) -> None:
+        """Append changed edits to the log instead of rewriting the full snapshot."""
+        if not changes:
+            return
+        lines = b"".join(
+            _json_dumps({"id": segment_id, "text": text}, indent=False) + b"\n" for segment_id, text in changes.items()
+        )
+        with self.edits_log_path.open("a+b") as fh:
+            log_size = fh.seek(0, os.SEEK_END)
+            if log_size:
+                _ = fh.seek(log_size - 1)
+                if fh.read(1) != b"\n":
+                    # An interrupted append left a torn last line; start a fresh one so this entry replays on its own.
+                    lines = b"\n" + lines
+            _ = fh.write(lines)
+            log_size = fh.tell()
+        # The snapshot on disk no longer reflects the latest edits.
+        self._last_written_edits = None
+        if log_size > EDITS_LOG_COMPACT_BYTES:
+            self.compact_edits()
+
+    def write_edits_and_state(self, edits_delta: dict[str, str], state: dict[str, str]) -> None:
+        """Persist a save in one call: append the changed edits, then write state if it moved."""
+        self.append_edits(edits_delta)
+        self.write_state(state)
+
+    def compact_edits(self) -> None:
+        """Fold the edits log into edits.json and remove the log."""
+        self.write_edits(self.read_edits())
 
     def read_state(self) -> dict[str, str]:
         if not self.state_path.exists():
             return {}
-        raw_value = cast(JSONValue, json.loads(self.state_path.read_text(encoding="utf-8")))
+        raw_value = load_json(self.state_path.read_bytes())
         if not isinstance(raw_value, dict):
             raise ValueError("Invalid state data.")
         state: dict[str, str] = {}
@@ -155,11 +270,13 @@ class ProjectStore:
         return state
 
     def write_state(self, state: dict[str, str]) -> None:
-        with self.state_path.open("w", encoding="utf-8") as fh:
-            json.dump(state, fh, indent=2)
+        if state == self._last_written_state:
+            return
+        _atomic_write_bytes(self.state_path, _json_dumps(state))
+        self._last_written_state = dict(state)
 
     def write_master(self, text: str) -> None:
-        _ = self.master_path.write_text(text, encoding="utf-8")
+        _atomic_write_bytes(self.master_path, text.encode("utf-8"))
 
 
 def _coerce_str_list(value: JSONValue | None) -> list[str]:
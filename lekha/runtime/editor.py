@@ -21,8 +21,9 @@ class SegmentEditor:
         self.parents: dict[str, str] = parents
         self.edits: dict[str, str] = edits
         self.store: ProjectStore = store
+        self._pending: dict[str, str] = {}
 
-    def save(self, segment_id: str, view: str, text: str) -> None:
+    def save(self, segment_id: str, view: str, text: str, persist: bool = True) -> None:
         """
         Save edited text for a segment.
 
@@ -30,12 +31,14 @@ class SegmentEditor:
             segment_id: ID of segment to save
             view: Current view mode ("line" or "word")
             text: New text content
+            persist: Write to storage now; pass False to batch with a later flush()
         """
         if view == "line":
             self._save_line(segment_id, text)
         else:
             self._save_word(segment_id, text)
-        self._persist()
+        if persist:
+            self._persist()
 
     def _save_line(self, line_id: str, text: str) -> None:
         """
@@ -46,20 +49,20 @@ class SegmentEditor:
             text: New line text
         """
         line_segment = self.get_segment(line_id)
-        tokens = text.split()
         word_ids = line_segment.word_ids
         if word_ids:
-            if not tokens:
-                tokens = ["" for _ in word_ids]
+            # maxsplit keeps any surplus words together in the last token
+            tokens = text.rstrip().split(None, len(word_ids) - 1)
             if len(tokens) < len(word_ids):
                 tokens.extend([""] * (len(word_ids) - len(tokens)))
-            elif len(tokens) > len(word_ids):
-                leading = tokens[: len(word_ids) - 1]
-                trailing = " ".join(tokens[len(word_ids) - 1 :])
-                tokens = leading + [trailing]
+            else:
+                # The surplus keeps its original separators; store it single-spaced like the other words.
+                surplus = tokens[-1].split()
+                if len(surplus) > 1:
+                    tokens[-1] = " ".join(surplus)
             for word_id, token in zip(word_ids, tokens):
-                self.edits[word_id] = token
-        self.edits[line_id] = text
+                self._set_edit(word_id, token)
+        self._set_edit(line_id, text)
 
     def _save_word(self, word_id: str, text: str) -> None:
         """
@@ -70,7 +73,7 @@ class SegmentEditor:
             text: New word text
         """
         word_segment = self.get_segment(word_id)
-        self.edits[word_id] = text
+        self._set_edit(word_id, text)
         parent_line_id = self.parents.get(word_id)
         if parent_line_id:
             parent_segment = self.get_segment(parent_line_id)
@@ -81,7 +84,7 @@ class SegmentEditor:
                 else:
                     tokens.append(self.edits.get(child_id, self.get_segment(child_id).consensus_text))
             line_text = " ".join(tokens).strip()
-            self.edits[parent_line_id] = line_text
+            self._set_edit(parent_line_id, line_text)
         else:
             # ensure master text still consistent
             self._recalculate_line_from_word(word_segment.line_index, word_segment.page_index)
@@ -101,7 +104,12 @@ class SegmentEditor:
         tokens = [
             self.edits.get(word_id, self.segments_by_id[word_id].consensus_text) for word_id in line_segment.word_ids
         ]
-        self.edits[line_id] = " ".join(tokens).strip()
+        self._set_edit(line_id, " ".join(tokens).strip())
+
+    def _set_edit(self, segment_id: str, text: str) -> None:
+        """Record an edit in memory and queue it for the next persist."""
+        self.edits[segment_id] = text
+        self._pending[segment_id] = text
 
     def get_text(self, segment_id: str) -> str:
         """
@@ -113,8 +121,9 @@ class SegmentEditor:
         Returns:
             Current text content
         """
-        if segment_id in self.edits:
-            return self.edits[segment_id]
+        edited = self.edits.get(segment_id)
+        if edited is not None:
+            return edited
         segment = self.get_segment(segment_id)
         if segment.view == "line" and segment.word_ids:
             tokens = [self.get_text(word_id) for word_id in segment.word_ids]
@@ -149,8 +158,21 @@ class SegmentEditor:
             lines.append(self.get_text(line_id))
         return "\n".join(lines)
 
+    def flush(self, state: dict[str, str]) -> None:
+        """
+        Persist pending edits together with navigation state, then refresh the master text.
+
+        Args:
+            state: Current navigation state to write alongside the edits
+        """
+        pending, self._pending = self._pending, {}
+        self.store.write_edits_and_state(pending, state)
+        self.store.write_master(self.compose_master_text())
+
     def _persist(self) -> None:
-        """Write edits and master text to storage."""
-        self.store.write_edits(self.edits)
+        """Append changed edits and write master text to storage."""
+        # Detach before writing: another request thread may record edits while the log is being appended.
+        pending, self._pending = self._pending, {}
+        self.store.append_edits(pending)
         master_text = self.compose_master_text()
         self.store.write_master(master_text)
@@ -2,10 +2,37 @@
 
 from __future__ import annotations
 
+import io
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
 from PIL import Image
 
+from ..config import get_png_compress_level
 from ..project import ProjectStore, Segment
 
+# Maximum number of encoded segment crops kept in memory per project.
+ENCODED_CACHE_SIZE = 256
+
+# Supported crop encodings and their MIME types.
+IMAGE_FORMATS: dict[str, str] = {"png": "image/png", "webp": "image/webp"}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _read_png_size(image_path: Path) -> tuple[int, int] | None:
+    """Read width and height from a PNG's IHDR chunk, or return None if the file isn't a PNG."""
+    with image_path.open("rb") as fh:
+        header = fh.read(24)
+    if len(header) < 24 or header[:8] != _PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", header[16:24])
+    if width <= 0 or height <= 0:
+        return None
+    return width, height
+
 
 class ImageService:
     """Handles image loading, cropping, and dimension caching for segments."""
@@ -14,7 +41,11 @@ class ImageService:
         self.store: ProjectStore = store
         self.segments_by_id: dict[str, Segment] = segments_by_id
         self.page_dimensions: dict[str, tuple[int, int]] = {}
+        self.page_paths: dict[str, Path] = {}
         self.crop_cache: dict[str, dict[str, int]] = {}
+        self.encoded_cache: OrderedDict[tuple[str, str, int, int, int, int, int], bytes] = OrderedDict()
+        self._encoded_lock: threading.Lock = threading.Lock()
+        self.png_compress_level: int = get_png_compress_level()
 
     def load_segment_image(self, segment: Segment, crop: dict[str, int] | None = None) -> Image.Image:
         """
@@ -31,7 +62,7 @@ class ImageService:
             FileNotFoundError: If image file doesn't exist
             RuntimeError: If image cannot be loaded or processed
         """
-        image_path = self.store.assets_dir / segment.page_image
+        image_path = self._page_path(segment.page_image)
         if not image_path.exists():
             raise FileNotFoundError(f"Image file not found: {segment.page_image}")
         crop_bounds = crop or self.get_crop_bounds(segment.segment_id)
@@ -45,6 +76,102 @@ class ImageService:
         except (OSError, IOError) as exc:
             raise RuntimeError(f"Failed to load or process image {segment.page_image}: {exc}") from exc
 
+    def render_segment_image(self, segment: Segment, crop: dict[str, int] | None = None, fmt: str = "png") -> bytes:
+        """
+        Encode a segment crop, reusing recently encoded crops.
+
+        Args:
+            segment: The segment to render
+            crop: Optional crop bounds dict, otherwise computed from segment
+            fmt: Output encoding, one of IMAGE_FORMATS
+
+        Returns:
+            Encoded bytes of the cropped region
+
+        Raises:
+            ValueError: If fmt is not a supported encoding
+            FileNotFoundError: If image file doesn't exist
+            RuntimeError: If image cannot be loaded or processed
+        """
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt}")
+        crop_bounds = crop or self.get_crop_bounds(segment.segment_id)
+        key = (
+            segment.segment_id,
+            fmt,
+            self.page_mtime_ns(segment.page_image),
+            crop_bounds["left"],
+            crop_bounds["top"],
+            crop_bounds["right"],
+            crop_bounds["bottom"],
+        )
+        with self._encoded_lock:
+            cached = self.encoded_cache.get(key)
+            if cached is not None:
+                self.encoded_cache.move_to_end(key)
+                return cached
+        # Encode outside the lock, which only guards the OrderedDict. Two threads missing the same key
+        # just encode it twice and store identical bytes.
+        image = self.load_segment_image(segment, crop_bounds)
+        buffer = io.BytesIO()
+        if fmt == "webp":
+            # Scans are continuous-tone, where lossy WebP is far smaller and cheaper than deflate.
+            image.save(buffer, format="WEBP", quality=85, method=4)
+        else:
+            # Crops are viewed interactively, so favor encode speed over payload size.
+            image.save(buffer, format="PNG", compress_level=self.png_compress_level, optimize=False)
+        data = buffer.getvalue()
+        with self._encoded_lock:
+            self.encoded_cache[key] = data
+            self.encoded_cache.move_to_end(key)
+            while len(self.encoded_cache) > ENCODED_CACHE_SIZE:
+                _ = self.encoded_cache.popitem(last=False)
+        return data
+
+    def raw_page_path_if_full(self, segment_id: str, crop: dict[str, int], fmt: str = "png") -> Path | None:
+        """
+        Return the page file when a crop spans the whole page and already has the requested encoding.
+
+        Args:
+            segment_id: ID of the segment
+            crop: Crop bounds dict for the segment
+            fmt: Requested encoding, one of IMAGE_FORMATS
+
+        Returns:
+            Path to the page image that can be sent as-is, or None if it must be re-encoded
+
+        Raises:
+            FileNotFoundError: If image file doesn't exist
+            RuntimeError: If image cannot be loaded or processed
+        """
+        segment = self.segments_by_id[segment_id]
+        image_path = self._page_path(segment.page_image)
+        if image_path.suffix.lower() != f".{fmt}":
+            return None
+        width, height = self._get_page_dimensions(segment.page_image)
+        if (crop["left"], crop["top"], crop["right"], crop["bottom"]) != (0, 0, width, height):
+            return None
+        return image_path
+
+    def page_mtime_ns(self, page_image: str) -> int:
+        """
+        Get the modification time of a page image, for cache validation.
+
+        Args:
+            page_image: Name of the page image file
+
+        Returns:
+            Modification time in nanoseconds
+
+        Raises:
+            FileNotFoundError: If image file doesn't exist
+        """
+        image_path = self._page_path(page_image)
+        try:
+            return image_path.stat().st_mtime_ns
+        except FileNotFoundError as exc:
+            raise FileNotFoundError(f"Image file not found: {page_image}") from exc
+
     def get_crop_bounds(self, segment_id: str) -> dict[str, int]:
         """
         Get crop bounds for a segment, using cache if available.
@@ -55,11 +182,11 @@ class ImageService:
         Returns:
             Dictionary with keys: left, top, right, bottom, width, height
         """
-        if segment_id not in self.crop_cache:
-            segment = self.segments_by_id[segment_id]
-            crop = self._crop_geometry(segment)
+        crop = self.crop_cache.get(segment_id)
+        if crop is None:
+            crop = self._crop_geometry(self.segments_by_id[segment_id])
             self.crop_cache[segment_id] = crop
-        return self.crop_cache[segment_id]
+        return crop
 
     def _crop_geometry(
         self, segment: Segment, padding_x_ratio: float = 0.1, padding_y_ratio: float = 0.5
@@ -98,6 +225,22 @@ class ImageService:
             "height": crop_height,
         }
 
+    def _page_path(self, page_image: str) -> Path:
+        """
+        Resolve a page image name to its file under the project assets folder.
+
+        Args:
+            page_image: Name of the page image file
+
+        Returns:
+            Path to the page image, memoized per name
+        """
+        image_path = self.page_paths.get(page_image)
+        if image_path is None:
+            image_path = self.store.assets_dir / page_image
+            self.page_paths[page_image] = image_path
+        return image_path
+
     def _get_page_dimensions(self, page_image: str) -> tuple[int, int]:
         """
         Lazily load page dimensions for an image.
@@ -113,17 +256,21 @@ class ImageService:
             FileNotFoundError: If image file doesn't exist
             RuntimeError: If image cannot be loaded
         """
-        if page_image in self.page_dimensions:
-            return self.page_dimensions[page_image]
+        dimensions = self.page_dimensions.get(page_image)
+        if dimensions is not None:
+            return dimensions
 
-        image_path = self.store.assets_dir / page_image
+        image_path = self._page_path(page_image)
         if not image_path.exists():
             raise FileNotFoundError(f"Image file not found: {page_image}")
 
         try:
-            with Image.open(image_path) as image:
-                dimensions = image.size
-                self.page_dimensions[page_image] = dimensions
-                return dimensions
+            # Page images are normally PNGs, whose size sits in the first 24 bytes; only fall back to PIL otherwise.
+            dimensions = _read_png_size(image_path)
+            if dimensions is None:
+                with Image.open(image_path) as image:
+                    dimensions = image.size
+            self.page_dimensions[page_image] = dimensions
+            return dimensions
         except (OSError, IOError) as exc:
             raise RuntimeError(f"Failed to load image dimensions for {page_image}: {exc}") from exc
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
+
 from ..project import ProjectStore, Segment
 
 
@@ -23,6 +25,9 @@ class SegmentNavigator:
         self.edits: dict[str, str] = edits
         self.state: dict[str, str] = state
         self.store: ProjectStore = store
+        # Per-view lookups keyed on the order list they were built from, so replacing that list invalidates them.
+        self._conflict_positions: dict[str, tuple[list[str], list[int]]] = {}
+        self._index_maps: dict[str, tuple[list[str], dict[str, int]]] = {}
 
     def navigate(self, view: str, current_id: str, action: str) -> str:
         """
@@ -39,10 +44,7 @@ class SegmentNavigator:
         order = self.orders.get(view, [])
         if not order:
             return current_id
-        try:
-            index = order.index(current_id)
-        except ValueError:
-            index = 0
+        index = self._index_map(view, order).get(current_id, 0)
         if action == "prev":
             index = max(index - 1, 0)
         elif action == "next":
@@ -64,17 +66,52 @@ class SegmentNavigator:
             Segment ID with next conflict, or None if none found
         """
         order = self.orders.get(view, [])
-        length = len(order)
-        if not length:
+        if not order:
             return None
-        begin = max(start_index + 1, 0)
-        for idx in range(begin, length):
-            seg_id = order[idx]
-            segment = self.segments_by_id[seg_id]
-            if segment.has_conflict and seg_id not in self.edits:
+        positions = self._conflicts_in(view, order)
+        edits = self.edits
+        # Only conflicted segments can be issues, so jump straight to the first one past start_index.
+        for position in range(bisect_right(positions, start_index), len(positions)):
+            seg_id = order[positions[position]]
+            if seg_id not in edits:
                 return seg_id
         return None
 
+    def _index_map(self, view: str, order: list[str]) -> dict[str, int]:
+        """
+        Get each segment's position in a view's order, rebuilding if the order list was replaced.
+
+        Args:
+            view: View mode the order belongs to
+            order: Current ordered segment IDs for the view
+
+        Returns:
+            Mapping of segment ID to its index in ``order``
+        """
+        cached = self._index_maps.get(view)
+        if cached is None or cached[0] is not order:
+            cached = (order, {seg_id: idx for idx, seg_id in enumerate(order)})
+            self._index_maps[view] = cached
+        return cached[1]
+
+    def _conflicts_in(self, view: str, order: list[str]) -> list[int]:
+        """
+        Get the indices of conflicted segments in a view's order, rebuilding if the order list was replaced.
+
+        Args:
+            view: View mode the order belongs to
+            order: Current ordered segment IDs for the view
+
+        Returns:
+            Ascending indices into ``order`` whose segments have conflicts
+        """
+        cached = self._conflict_positions.get(view)
+        if cached is None or cached[0] is not order:
+            positions = [idx for idx, seg_id in enumerate(order) if self.segments_by_id[seg_id].has_conflict]
+            cached = (order, positions)
+            self._conflict_positions[view] = cached
+        return cached[1]
+
     def switch_view(self, current_segment: str, target_view: str) -> str:
         """
         Switch between line and word views, maintaining position when possible.
@@ -114,6 +151,17 @@ class SegmentNavigator:
         """
         Save current view and segment to persistent state.
 
+        Args:
+            view: Current view mode
+            segment_id: Current segment ID
+        """
+        self.update_state(view, segment_id)
+        self.store.write_state(self.state)
+
+    def update_state(self, view: str, segment_id: str) -> None:
+        """
+        Update the in-memory navigation state without writing it.
+
         Args:
             view: Current view mode
             segment_id: Current segment ID
@@ -122,7 +170,6 @@ class SegmentNavigator:
         self.state.clear()
         self.state["view"] = view
         self.state["segment_id"] = segment_id
-        self.store.write_state(self.state)
 
     def navigation_status(self, segment_id: str, view: str) -> dict[str, bool]:
         """
@@ -140,9 +187,8 @@ class SegmentNavigator:
         order = self.orders.get(view, [])
         if not order:
             return {"can_prev": False, "can_next": False, "has_next_issue": False}
-        try:
-            index = order.index(segment_id)
-        except ValueError:
+        index = self._index_map(view, order).get(segment_id)
+        if index is None:
             return {"can_prev": False, "can_next": False, "has_next_issue": False}
         can_prev = index > 0
         can_next = index < len(order) - 1
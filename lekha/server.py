@@ -3,30 +3,57 @@
 from __future__ import annotations
 
 import io
-import json
 import logging
 import os
 import secrets
+from collections import OrderedDict
+from operator import attrgetter
 from pathlib import Path
 from typing import cast
 
-from flask import Flask, abort, jsonify, request, send_file, send_from_directory, session
+from flask import Flask, Response, abort, jsonify, request, send_file, send_from_directory, session
+from flask.json.provider import DefaultJSONProvider
 from flask.typing import ResponseReturnValue
 from PIL import Image
 
+try:
+    from typing import override
+except ImportError:  # pragma: no cover - typing.override is new in Python 3.12
+    from typing_extensions import override
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack  # pyright: ignore[reportMissingModuleSource]
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
 from .project import JSONValue, ProjectStore, Segment
 from .config import get_data_root
 from .runtime import ImageService, SegmentNavigator, SegmentEditor
+from .runtime.image_service import IMAGE_FORMATS
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of project runtimes kept loaded at once.
+RUNTIME_CACHE_SIZE = 8
+
+MSGPACK_MIMETYPE = "application/msgpack"
+
+# Key generated when LEKHA_WEB_SECRET is unset, shared by every app created in this process.
+_generated_key: str | None = None
+
 
 def get_or_generate_secret_key() -> str:
     """
     Get secret key from environment or generate a new one.
     Warns if using the default development key.
-    Returns a cryptographically secure secret key.
+    Returns a cryptographically secure secret key, generated once per process.
     """
+    global _generated_key
     env_secret = os.environ.get("LEKHA_WEB_SECRET")
     if env_secret:
         if env_secret == "lekha-dev":
@@ -36,32 +63,70 @@ def get_or_generate_secret_key() -> str:
             )
         return env_secret
 
-    # Generate a secure random key
-    secret_key = secrets.token_hex(32)
-    logger.info("Generated new secret key for this session. Set LEKHA_WEB_SECRET to persist sessions across restarts.")
-    return secret_key
+    if _generated_key is None:
+        # Generate a secure random key
+        _generated_key = secrets.token_hex(32)
+        logger.info(
+            "Generated new secret key for this session. Set LEKHA_WEB_SECRET to persist sessions across restarts."
+        )
+    return _generated_key
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson when it is installed."""
+
+    @override
+    def dumps(self, obj: object, **kwargs: object) -> str:
+        assert orjson is not None
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS).decode()
+
+    @override
+    def loads(self, s: str | bytes, **kwargs: object) -> object:
+        assert orjson is not None
+        return orjson.loads(s)
 
 
 def create_app(store: ProjectStore) -> Flask:
     static_dir = Path(__file__).parent / "web" / "static"
     app = Flask(__name__, static_folder=str(static_dir), static_url_path="/static")
     app.secret_key = get_or_generate_secret_key()
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     default_project_id = store.project_id
-    runtime_cache: dict[str, ProjectRuntime] = {default_project_id: ProjectRuntime(store)}
+    # Least recently used projects are dropped first; their state is already on disk.
+    runtime_cache: OrderedDict[str, ProjectRuntime] = OrderedDict({default_project_id: ProjectRuntime(store)})
+    # Parsed manifests keyed on (mtime_ns, size), plus the sorted listing for the last set of stamps.
+    manifest_cache: dict[Path, tuple[int, int, dict[str, str] | None]] = {}
+    projects_cache: tuple[tuple[tuple[Path, int, int], ...], list[dict[str, str]]] | None = None
 
     def _payload_dict(raw: object, *, error_message: str) -> dict[str, object]:
         if not isinstance(raw, dict):
             abort(400, error_message)
-        result: dict[str, object] = {}
-        for key, value in cast(dict[object, object], raw).items():
-            if isinstance(key, str):
-                result[key] = value
-        return result
+        # JSON object keys are always strings, and callers type-check each value they read.
+        return cast(dict[str, object], raw)
+
+    def _load_json() -> object:
+        # Parse through app.json so orjson handles request bodies too when installed.
+        try:
+            return app.json.loads(request.get_data(cache=False))
+        except ValueError:
+            abort(400, "Invalid payload.")
+
+    def _negotiated(payload: dict[str, object]) -> ResponseReturnValue:
+        # Clients that prefer msgpack get a compact binary body when the extra is installed.
+        if msgpack is not None and request.accept_mimetypes.best == MSGPACK_MIMETYPE:
+            response = Response(msgpack.packb(payload, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+        else:
+            response = jsonify(payload)
+        # Either body may be cached, so caches must key it on the Accept header.
+        response.headers["Vary"] = "Accept"
+        return response
 
     def ensure_runtime(project_id: str) -> ProjectRuntime:
         if not project_id:
             raise RuntimeError("Project identifier is required.")
         if project_id in runtime_cache:
+            runtime_cache.move_to_end(project_id)
             return runtime_cache[project_id]
         project_root = get_data_root() / project_id
         if not project_root.exists():
@@ -69,13 +134,18 @@ def create_app(store: ProjectStore) -> Flask:
         tentative_store = ProjectStore(project_id)
         if not tentative_store.segments_path.exists():
             raise RuntimeError(f"Project '{project_id}' has no processed segments.")
-        runtime_cache[project_id] = ProjectRuntime(tentative_store)
-        return runtime_cache[project_id]
+        runtime = ProjectRuntime(tentative_store)
+        runtime_cache[project_id] = runtime
+        while len(runtime_cache) > RUNTIME_CACHE_SIZE:
+            _ = runtime_cache.popitem(last=False)
+        return runtime
 
     def current_runtime() -> ProjectRuntime:
         session_value = session.get("project_id")
         project_id = session_value if isinstance(session_value, str) and session_value else default_project_id
-        session["project_id"] = project_id
+        if session_value != project_id:
+            # Assigning marks the session modified, which re-signs and re-sends the cookie.
+            session["project_id"] = project_id
         try:
             runtime = ensure_runtime(project_id)
         except RuntimeError as exc:
@@ -92,7 +162,7 @@ def create_app(store: ProjectStore) -> Flask:
         state = runtime.ensure_state()
         payload: dict[str, object] = {key: value for key, value in state.items()}
         payload["project_id"] = runtime.store.project_id
-        return jsonify(payload)
+        return _negotiated(payload)
 
     @app.get("/api/segment/<segment_id>")
     def get_segment(segment_id: str) -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
@@ -107,26 +177,44 @@ def create_app(store: ProjectStore) -> Flask:
     def segment_image(segment_id: str) -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
         runtime = current_runtime()
         seg = runtime.get_segment(segment_id)
+        fmt_arg = request.args.get("fmt", "png")
+        if fmt_arg not in IMAGE_FORMATS:
+            abort(400, f"Unsupported image format: {fmt_arg}")
         try:
             crop_bounds = runtime.get_crop_bounds(segment_id)
-            image = runtime.load_segment_image(seg, crop_bounds)
+            mtime_ns = runtime.page_mtime_ns(seg.page_image)
         except FileNotFoundError as exc:
             abort(404, str(exc))
         except RuntimeError as exc:
             abort(500, str(exc))
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        _ = buffer.seek(0)
-        response = send_file(buffer, mimetype="image/png")
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
+        bounds = "-".join(str(crop_bounds[key]) for key in ("left", "top", "right", "bottom"))
+        etag = f"{seg.page_image}:{mtime_ns}:{bounds}:{fmt_arg}"
+        if request.if_none_match.contains(etag):
+            # The browser already holds this crop; answer before touching PIL at all.
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+        else:
+            try:
+                # A crop covering the whole page is the page file itself; skip the decode/encode round trip.
+                raw_path = runtime.raw_page_path_if_full(segment_id, crop_bounds, fmt=fmt_arg)
+                body: Path | io.BytesIO
+                if raw_path is not None:
+                    body = raw_path
+                else:
+                    body = io.BytesIO(runtime.render_segment_image(seg, crop_bounds, fmt=fmt_arg))
+            except FileNotFoundError as exc:
+                abort(404, str(exc))
+            except RuntimeError as exc:
+                abort(500, str(exc))
+            # Crops only change when the page image does, so let browsers revalidate via ETag.
+            response = send_file(body, mimetype=IMAGE_FORMATS[fmt_arg], etag=etag, conditional=True)
+        response.headers["Cache-Control"] = "private, max-age=3600, must-revalidate"
         return response
 
     @app.post("/api/save")
     def save_segment() -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
         runtime = current_runtime()
-        raw_json = cast(object, request.get_json(force=True))
+        raw_json = _load_json()
         data = _payload_dict(raw_json, error_message="Invalid payload.")
         segment_id_val = data.get("segment_id")
         view_val = data.get("view")
@@ -140,9 +228,7 @@ def create_app(store: ProjectStore) -> Flask:
             abort(400, "text must be a string.")
         if not isinstance(action_val, str):
             abort(400, "action must be a string.")
-        runtime.save(segment_id_val, view_val, text_val)
-        next_id = runtime.navigate(view_val, segment_id_val, action_val)
-        runtime.persist_state(view_val, next_id)
+        next_id = runtime.save_and_navigate(segment_id_val, view_val, text_val, action_val)
         payload = runtime.segment_payload(next_id, view=view_val)
         payload["view"] = view_val
         return jsonify(payload)
@@ -150,7 +236,7 @@ def create_app(store: ProjectStore) -> Flask:
     @app.post("/api/view")
     def change_view() -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
         runtime = current_runtime()
-        raw_json = cast(object, request.get_json(force=True))
+        raw_json = _load_json()
         data = _payload_dict(raw_json, error_message="Invalid payload.")
         target_view_raw = data.get("view")
         current_segment_raw = data.get("segment_id")
@@ -166,29 +252,58 @@ def create_app(store: ProjectStore) -> Flask:
         payload["view"] = target_view
         return jsonify(payload)
 
+    def _read_project_entry(manifest_path: Path) -> dict[str, str] | None:
+        try:
+            raw_value = cast(JSONValue, app.json.loads(manifest_path.read_bytes()))
+        except Exception:
+            return None
+        if not isinstance(raw_value, dict):
+            return None
+        project_id = raw_value.get("project_id")
+        if not isinstance(project_id, str):
+            return None
+        label_value = raw_value.get("source")
+        label = label_value if isinstance(label_value, str) else project_id
+        return {"project_id": project_id, "label": label}
+
     @app.get("/api/projects")
     def list_projects() -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
+        nonlocal projects_cache
+        stamps: list[tuple[Path, int, int]] = []
+        with os.scandir(get_data_root()) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                manifest_path = Path(entry.path) / "manifest.json"
+                try:
+                    stat = manifest_path.stat()
+                except OSError:
+                    continue
+                stamps.append((manifest_path, stat.st_mtime_ns, stat.st_size))
+        stamps.sort()
+        key = tuple(stamps)
+        if projects_cache is not None and projects_cache[0] == key:
+            return _negotiated({"projects": projects_cache[1]})
         projects: list[dict[str, str]] = []
-        data_root = get_data_root()
-        for manifest_path in data_root.glob("*/manifest.json"):
-            try:
-                raw_value = cast(JSONValue, json.loads(manifest_path.read_text(encoding="utf-8")))
-            except Exception:
-                continue
-            if not isinstance(raw_value, dict):
-                continue
-            project_id = raw_value.get("project_id")
-            if not isinstance(project_id, str):
-                continue
-            label_value = raw_value.get("source")
-            label = label_value if isinstance(label_value, str) else project_id
-            projects.append({"project_id": project_id, "label": label})
+        fresh_cache: dict[Path, tuple[int, int, dict[str, str] | None]] = {}
+        for manifest_path, mtime_ns, size in stamps:
+            cached = manifest_cache.get(manifest_path)
+            if cached is not None and cached[:2] == (mtime_ns, size):
+                project_entry = cached[2]
+            else:
+                project_entry = _read_project_entry(manifest_path)
+            fresh_cache[manifest_path] = (mtime_ns, size, project_entry)
+            if project_entry is not None:
+                projects.append(project_entry)
+        manifest_cache.clear()
+        manifest_cache.update(fresh_cache)
         projects.sort(key=lambda item: item.get("label") or item.get("project_id") or "")
-        return jsonify({"projects": projects})
+        projects_cache = (key, projects)
+        return _negotiated({"projects": projects})
 
     @app.post("/api/project")
     def change_project() -> ResponseReturnValue:  # pyright: ignore[reportUnusedFunction]
-        raw_json = cast(object, request.get_json(force=True))
+        raw_json = _load_json()
         data = _payload_dict(raw_json, error_message="Invalid payload.")
         project_id = data.get("project_id")
         if not project_id:
@@ -242,7 +357,8 @@ def create_app(store: ProjectStore) -> Flask:
 
 
 def run_server(app: Flask, port: int = 8765) -> None:
-    app.run(host="127.0.0.1", port=port, debug=False)
+    # threaded=True is already Flask's default; it is spelled out because the editor relies on concurrent requests.
+    app.run(host="127.0.0.1", port=port, debug=False, threaded=True)
 
 
 class ProjectRuntime:
@@ -253,16 +369,26 @@ class ProjectRuntime:
         self.segments: list[Segment] = store.load_segments()
         if not self.segments:
             raise RuntimeError("No segments available. Run OCR processing first.")
-        self.segments_by_id: dict[str, Segment] = {segment.segment_id: segment for segment in self.segments}
-        self.orders: dict[str, list[str]] = {
-            "line": self._ordered_ids("line"),
-            "word": self._ordered_ids("word"),
-        }
+        self.segments_by_id: dict[str, Segment] = {}
         self.parents: dict[str, str] = {}
+        # Index, bucket by view and record word parents in one pass, then sort each bucket once.
+        by_view: dict[str, list[Segment]] = {"line": [], "word": []}
+        conflict_ids: set[str] = set()
         for segment in self.segments:
+            self.segments_by_id[segment.segment_id] = segment
+            bucket = by_view.get(segment.view)
+            if bucket is not None:
+                bucket.append(segment)
             if segment.view == "line":
                 for word_id in segment.word_ids:
                     self.parents[word_id] = segment.segment_id
+            if segment.has_conflict:
+                conflict_ids.add(segment.segment_id)
+        self._conflict_ids: frozenset[str] = frozenset(conflict_ids)
+        sort_key = attrgetter("sort_key")
+        self.orders: dict[str, list[str]] = {
+            view: [segment.segment_id for segment in sorted(bucket, key=sort_key)] for view, bucket in by_view.items()
+        }
         self.edits: dict[str, str] = self.store.read_edits()
         self.state: dict[str, str] = self.store.read_state()
 
@@ -271,18 +397,10 @@ class ProjectRuntime:
         self.navigator: SegmentNavigator = SegmentNavigator(self.orders, self.segments_by_id, self.parents, self.edits, self.state, store)
         self.editor: SegmentEditor = SegmentEditor(self.orders, self.segments_by_id, self.parents, self.edits, store)
 
-        _ = self.ensure_state()
+        # Payloads only change when edits do, so they are cached until the next save.
+        self._payload_cache: dict[tuple[str, str], dict[str, object]] = {}
 
-    def _ordered_ids(self, view: str) -> list[str]:
-        filtered = [seg for seg in self.segments if seg.view == view]
-        filtered.sort(
-            key=lambda seg: (
-                seg.page_index,
-                seg.line_index,
-                seg.word_index if seg.word_index is not None else -1,
-            )
-        )
-        return [seg.segment_id for seg in filtered]
+        _ = self.ensure_state()
 
     def ensure_state(self) -> dict[str, str]:
         default_view = "line" if self.orders["line"] else "word"
@@ -307,24 +425,28 @@ class ProjectRuntime:
         return self.state
 
     def get_segment(self, segment_id: str) -> Segment:
-        if segment_id not in self.segments_by_id:
+        segment = self.segments_by_id.get(segment_id)
+        if segment is None:
             abort(404, f"Unknown segment {segment_id}")
-        return self.segments_by_id[segment_id]
+        return segment
 
     def segment_payload(self, segment_id: str, view: str | None = None) -> dict[str, object]:
         segment = self.get_segment(segment_id)
-        text = self.editor.get_text(segment_id)
-        resolved = segment_id in self.edits
-        has_conflict = segment.has_conflict and not resolved
         active_view = view if view in {"line", "word"} else segment.view
-        return {
-            "segment_id": segment.segment_id,
-            "view": segment.view,
-            "text": text,
-            "has_conflict": has_conflict,
-            "image_url": f"/api/segment/{segment.segment_id}/image?project={self.store.project_id}",
-            "navigation": self.navigator.navigation_status(segment.segment_id, active_view),
-        }
+        key = (segment_id, active_view)
+        cached = self._payload_cache.get(key)
+        if cached is None:
+            payload: dict[str, object] = {
+                "segment_id": segment.segment_id,
+                "view": segment.view,
+                "text": self.editor.get_text(segment_id),
+                "has_conflict": segment_id in self._conflict_ids and segment_id not in self.edits,
+                "image_url": f"/api/segment/{segment.segment_id}/image?project={self.store.project_id}",
+                "navigation": self.navigator.navigation_status(segment.segment_id, active_view),
+            }
+            self._payload_cache[key] = cached = payload
+        # Routes decorate the payload with extra keys, so hand out a copy.
+        return dict(cached)
 
     # Delegation methods to services
 
@@ -336,6 +458,18 @@ class ProjectRuntime:
         """Delegate to image service."""
         return self.image_service.get_crop_bounds(segment_id)
 
+    def render_segment_image(self, segment: Segment, crop: dict[str, int] | None = None, fmt: str = "png") -> bytes:
+        """Delegate to image service."""
+        return self.image_service.render_segment_image(segment, crop, fmt)
+
+    def raw_page_path_if_full(self, segment_id: str, crop: dict[str, int], fmt: str = "png") -> Path | None:
+        """Delegate to image service."""
+        return self.image_service.raw_page_path_if_full(segment_id, crop, fmt)
+
+    def page_mtime_ns(self, page_image: str) -> int:
+        """Delegate to image service."""
+        return self.image_service.page_mtime_ns(page_image)
+
     def _get_page_dimensions(self, page_image: str) -> tuple[int, int]:
         """Delegate to image service (for backwards compatibility in tests)."""
         return self.image_service._get_page_dimensions(page_image)  # pyright: ignore[reportPrivateUsage]
@@ -343,6 +477,17 @@ class ProjectRuntime:
     def save(self, segment_id: str, view: str, text: str) -> None:
         """Delegate to editor service."""
         self.editor.save(segment_id, view, text)
+        # Text, conflict flags and issue navigation all depend on edits.
+        self._payload_cache.clear()
+
+    def save_and_navigate(self, segment_id: str, view: str, text: str, action: str) -> str:
+        """Save a segment, move to the next one, and persist edits and state together."""
+        self.editor.save(segment_id, view, text, persist=False)
+        self._payload_cache.clear()
+        next_id = self.navigator.navigate(view, segment_id, action)
+        self.navigator.update_state(view, next_id)
+        self.editor.flush(self.state)
+        return next_id
 
     def get_text(self, segment_id: str) -> str:
         """Delegate to editor service."""
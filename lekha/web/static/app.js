@@ -69,6 +69,8 @@ function updateTextbox(text) {
 function updateImage(src, hasConflict) {
   resetZoom();
   if (src) {
+    // Scans are continuous-tone, so WebP crops are much smaller than PNG.
+    src = `${src}${src.includes("?") ? "&" : "?"}fmt=webp`;
     imageEl.src = src;
     if (zoomPreview) {
       zoomPreview.style.backgroundImage = `url('${src}')`;
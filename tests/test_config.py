@@ -6,7 +6,7 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from lekha.config import APP_NAME, get_data_root
+from lekha.config import APP_NAME, DEFAULT_PNG_COMPRESS_LEVEL, get_data_root, get_png_compress_level
 
 
 class GetDataRootTests(unittest.TestCase):
@@ -43,3 +43,30 @@ class GetDataRootTests(unittest.TestCase):
                 root = get_data_root()
                 self.assertEqual(root, local_app_data / APP_NAME)
                 self.assertTrue(root.exists())
+
+    def test_lekha_data_root_overrides_platform_location(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base = Path(tmp_dir)
+            override = base / "override"
+            with patch("platform.system", return_value="Windows"), patch(
+                "pathlib.Path.home", return_value=base / "home"
+            ), patch.dict(
+                os.environ, {"LEKHA_DATA_ROOT": str(override), "LOCALAPPDATA": str(base / "LocalAppData")}, clear=True
+            ):
+                root = get_data_root()
+                self.assertEqual(root, override)
+                self.assertTrue(root.exists())
+
+
+class GetPngCompressLevelTests(unittest.TestCase):
+    def test_defaults_to_fast_level(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_png_compress_level(), DEFAULT_PNG_COMPRESS_LEVEL)
+
+    def test_reads_and_clamps_environment(self) -> None:
+        with patch.dict(os.environ, {"LEKHA_PNG_LEVEL": "6"}, clear=True):
+            self.assertEqual(get_png_compress_level(), 6)
+        with patch.dict(os.environ, {"LEKHA_PNG_LEVEL": "42"}, clear=True):
+            self.assertEqual(get_png_compress_level(), 9)
+        with patch.dict(os.environ, {"LEKHA_PNG_LEVEL": "fast"}, clear=True):
+            self.assertEqual(get_png_compress_level(), DEFAULT_PNG_COMPRESS_LEVEL)
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
 import unittest
+from unittest.mock import patch
 
-from lekha.diffing import BaseToken, WordConsensus, compute_word_consensus, tokenize
+from lekha.diffing import (
+    BaseToken,
+    ConsensusTable,
+    WordConsensus,
+    _bitparallel_matching_blocks,  # pyright: ignore[reportPrivateUsage]
+    _diff_model_text,  # pyright: ignore[reportPrivateUsage]
+    _diff_opcodes,  # pyright: ignore[reportPrivateUsage]
+    _myers_matching_blocks,  # pyright: ignore[reportPrivateUsage]
+    compute_consensus_table,
+    compute_word_consensus,
+    tokenize,
+)
 
 
 class TokenizeTests(unittest.TestCase):
@@ -18,6 +30,14 @@ class TokenizeTests(unittest.TestCase):
         result = tokenize("hello  world   foo")
         self.assertEqual(result, ["hello", "world", "foo"])
 
+    def test_tokenize_interns_tokens(self) -> None:
+        first, second = tokenize("".join(["re", "peat"]) + " " + "".join(["rep", "eat"]))
+        self.assertIs(first, second)
+
+    def test_tokenize_splits_on_any_unicode_whitespace(self) -> None:
+        result = tokenize("\tहिन्दी\nlipi\u00a0text\u3000end \r")
+        self.assertEqual(result, ["हिन्दी", "lipi", "text", "end"])
+
 
 class WordConsensusPropertyTests(unittest.TestCase):
     def test_has_conflict_false_when_no_alternatives(self) -> None:
@@ -72,6 +92,13 @@ class WordConsensusPropertyTests(unittest.TestCase):
         self.assertIn("hello", parts)
         self.assertIn("hallo", parts)
 
+    def test_derived_views_are_cached(self) -> None:
+        consensus = WordConsensus(base="hello", line_index=0, word_index=0, alternatives={"model1": "hallo"})
+        self.assertEqual(consensus.display_text, "[hello/hallo]")
+        self.assertIn("display_text", vars(consensus))
+        self.assertTrue(consensus.has_conflict)
+        self.assertIn("has_conflict", vars(consensus))
+
 
 class ComputeWordConsensusTests(unittest.TestCase):
     def test_consensus_with_no_models_returns_base(self) -> None:
@@ -96,6 +123,28 @@ class ComputeWordConsensusTests(unittest.TestCase):
         self.assertFalse(result[0].has_conflict)
         self.assertFalse(result[1].has_conflict)
 
+    def test_consensus_skips_diff_for_identical_model_text(self) -> None:
+        base_tokens = [
+            BaseToken(text="hello", line_index=0, word_index=0),
+            BaseToken(text="world", line_index=0, word_index=1),
+        ]
+        with patch("lekha.diffing._diff_opcodes") as diff:
+            result = compute_word_consensus(base_tokens, {"model1": "hello  world"})
+        diff.assert_not_called()
+        self.assertEqual([entry.alternatives for entry in result], [{}, {}])
+
+    def test_consensus_reuses_cached_diffs(self) -> None:
+        base_tokens = [
+            BaseToken(text="cached", line_index=0, word_index=0),
+            BaseToken(text="words", line_index=0, word_index=1),
+        ]
+        _diff_model_text.cache_clear()
+        first = compute_word_consensus(base_tokens, {"model1": "cashed words"})
+        second = compute_word_consensus(base_tokens, {"model1": "cashed words"})
+        self.assertEqual(_diff_model_text.cache_info().hits, 1)
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0].alternatives, second[0].alternatives)
+
     def test_consensus_with_replacement(self) -> None:
         base_tokens = [
             BaseToken(text="hello", line_index=0, word_index=0),
@@ -162,6 +211,23 @@ class ComputeWordConsensusTests(unittest.TestCase):
         self.assertTrue(result[2].has_conflict)
         self.assertEqual(result[2].alternatives["model1"], "red")
 
+    def test_consensus_table_columns_match_records(self) -> None:
+        base_tokens = [
+            BaseToken(text="hello", line_index=0, word_index=0),
+            BaseToken(text="world", line_index=1, word_index=0),
+        ]
+        table = compute_consensus_table(base_tokens, {"model1": "hallo world"})
+        self.assertIsInstance(table, ConsensusTable)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.bases, ["hello", "world"])
+        self.assertEqual(list(table.line_indices), [0, 1])
+        self.assertEqual(table.alternatives_by_model, {"model1": ["hallo", None]})
+        self.assertEqual(table.alternatives_for(0), {"model1": "hallo"})
+        self.assertTrue(table.has_conflict(0))
+        self.assertFalse(table.has_conflict(1))
+        records = table.to_records()
+        self.assertEqual(records, compute_word_consensus(base_tokens, {"model1": "hallo world"}))
+
     def test_consensus_preserves_line_and_word_indices(self) -> None:
         base_tokens = [
             BaseToken(text="first", line_index=0, word_index=0),
@@ -175,3 +241,71 @@ class ComputeWordConsensusTests(unittest.TestCase):
         self.assertEqual(result[1].word_index, 0)
         self.assertEqual(result[2].line_index, 1)
         self.assertEqual(result[2].word_index, 1)
+
+
+class MyersMatchingBlocksTests(unittest.TestCase):
+    def test_identical_sequences_are_one_block(self) -> None:
+        tokens = ["a", "b", "c"]
+        self.assertEqual(_myers_matching_blocks(tokens, list(tokens)), [(0, 0, 3)])
+
+    def test_mixed_edits_keep_shared_words(self) -> None:
+        base = ["the", "quick", "brown", "fox", "jumps"]
+        model = ["the", "fast", "red", "fox", "leaps", "high"]
+        self.assertEqual(_myers_matching_blocks(base, model), [(0, 0, 1), (3, 3, 1)])
+
+    def test_empty_sides_have_no_blocks(self) -> None:
+        self.assertEqual(_myers_matching_blocks([], ["x"]), [])
+        self.assertEqual(_myers_matching_blocks(["x"], []), [])
+        self.assertEqual(_myers_matching_blocks([], []), [])
+
+
+class BitParallelDiffTests(unittest.TestCase):
+    def test_short_sequences_agree_with_myers(self) -> None:
+        base = ["the", "quick", "brown", "fox", "jumps"]
+        model = ["the", "fast", "red", "fox", "leaps", "high"]
+        self.assertEqual(_bitparallel_matching_blocks(base, model), _myers_matching_blocks(base, model))
+
+    def test_mixed_edits_match_sequence_matcher_shape(self) -> None:
+        base = ["the", "quick", "brown", "fox", "jumps"]
+        model = ["the", "fast", "red", "fox", "leaps", "high"]
+        self.assertEqual(
+            _diff_opcodes(base, model),
+            [
+                ("equal", 0, 1, 0, 1),
+                ("replace", 1, 3, 1, 3),
+                ("equal", 3, 4, 3, 4),
+                ("replace", 4, 5, 4, 6),
+            ],
+        )
+
+    def test_repeated_tokens_keep_longest_common_subsequence(self) -> None:
+        base = ["a", "b", "a", "b", "a"]
+        model = ["b", "a", "b", "b", "a", "a"]
+        opcodes = _diff_opcodes(base, model)
+        matched = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal")
+        self.assertEqual(matched, 4)
+
+    def test_long_sequences_fall_back_to_myers(self) -> None:
+        base = [f"w{index}" for index in range(100)]
+        model = [*base[:50], "inserted", *base[50:]]
+        self.assertEqual(
+            _diff_opcodes(base, model),
+            [("equal", 0, 50, 0, 50), ("insert", 50, 50, 50, 51), ("equal", 50, 100, 51, 101)],
+        )
+
+    def test_long_sequences_with_small_core_use_bitparallel(self) -> None:
+        base = [f"w{index}" for index in range(100)]
+        model = [*base[:40], "x", "y", *base[42:60], *base[61:]]
+        with patch("lekha.diffing._myers_matching_blocks") as myers:
+            opcodes = _diff_opcodes(base, model)
+        myers.assert_not_called()
+        self.assertEqual(
+            opcodes,
+            [
+                ("equal", 0, 40, 0, 40),
+                ("replace", 40, 42, 40, 42),
+                ("equal", 42, 60, 42, 60),
+                ("delete", 60, 61, 60, 60),
+                ("equal", 61, 100, 60, 99),
+            ],
+        )
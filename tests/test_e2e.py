@@ -5,10 +5,9 @@ from __future__ import annotations
 import tempfile
 import unittest
 from pathlib import Path
-from typing import cast, override
+from typing import ClassVar, cast, override
 from unittest.mock import MagicMock, patch
 
-from PIL import Image
 from flask import Flask
 from flask.testing import FlaskClient
 from typer.testing import CliRunner
@@ -19,51 +18,51 @@ from lekha.ocr.tesseract_engine import TesseractLine, TesseractResult, Tesseract
 from lekha.project import ProjectStore
 from lekha.server import ProjectRuntime
 
+# 160x60 white RGB PNG, pre-encoded so the fixture does not go through Pillow.
+_WHITE_PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000a00000003c08020000006e092642000000724944415478daedd1010100"
+    + "0004c440f4effc7a708bb0eb24a5bb8d0580055880055880055880010bb0000bb0000bb0000316600116600116600116"
+    + "60c0022cc0022cc0022cc080055880055880055880010bb0000bb0000bb0000b3060011660011660011660c0022cc002"
+    + "2cc0022cc0df5bcde30375fba4109c0000000049454e44ae426082"
+)
+
 
 class EndToEndWorkflowTests(unittest.TestCase):
     """Exercise CLI → processing → API flow with stubbed OCR output."""
 
-    temp_dir: tempfile.TemporaryDirectory[str] | None
-    data_root: Path | None
+    temp_path: ClassVar[Path]
+    data_root: ClassVar[Path]
+    manuscript_dir: ClassVar[Path]
+    image_path: ClassVar[Path]
     runner: CliRunner
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
-        self.temp_dir = None
-        self.data_root = None
         self.runner = CliRunner()
 
+    @classmethod
     @override
-    def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        base_path = Path(self.temp_dir.name)
-        self.data_root = base_path / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-
-        patchers = [
-            patch("lekha.project.get_data_root", return_value=self.data_root),
-            patch("lekha.cli.get_data_root", return_value=self.data_root),
-            patch("lekha.server.get_data_root", return_value=self.data_root),
-        ]
-        for patcher in patchers:
-            self.addCleanup(patcher.stop)
-            _ = patcher.start()
-
-        self.runner = CliRunner()
-
-    def _create_fixture_image(self, directory: Path) -> Path:
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # The tests only read the fixture image, so one temp tree and one set of patches serve the whole class.
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.data_root = cls.temp_path / "data"
+        cls.data_root.mkdir(parents=True, exist_ok=True)
+        for target in ("lekha.project.get_data_root", "lekha.cli.get_data_root", "lekha.server.get_data_root"):
+            _ = cls.enterClassContext(patch(target, return_value=cls.data_root))
+        cls.manuscript_dir = cls.temp_path / "manuscript"
+        cls.image_path = cls._create_fixture_image(cls.manuscript_dir)
+
+    @staticmethod
+    def _create_fixture_image(directory: Path) -> Path:
         directory.mkdir(parents=True, exist_ok=True)
         image_path = directory / "sample.png"
-        Image.new("RGB", (160, 60), color="white").save(image_path)
+        _ = image_path.write_bytes(_WHITE_PNG_BYTES)
         return image_path
 
     def test_cli_to_api_round_trip(self) -> None:
-        assert self.temp_dir is not None
-        assert self.data_root is not None
-
-        manuscript_dir = Path(self.temp_dir.name) / "manuscript"
-        image_path = self._create_fixture_image(manuscript_dir)
+        manuscript_dir = self.manuscript_dir
+        image_path = self.image_path
 
         word_hello = TesseractWord(
             text="Hello",
@@ -172,7 +171,7 @@ class EndToEndWorkflowTests(unittest.TestCase):
             self.assertEqual(image_resp.status_code, 200)
             self.assertEqual(image_resp.mimetype, "image/png")
             cache_header: str | None = image_resp.headers.get("Cache-Control")
-            self.assertIn("no-store", cache_header or "")
+            self.assertIn("must-revalidate", cache_header or "")
             image_resp.close()
 
             projects_resp: TestResponse = http_client.get("/api/projects")
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import io
 import tempfile
 import unittest
 from pathlib import Path
-from typing import override
-from unittest.mock import patch
+from typing import ClassVar, override
+from unittest.mock import MagicMock, patch
 
 from PIL import Image
 
@@ -20,12 +21,37 @@ from lekha.project import ProjectStore
 from lekha.ocr.tesseract_engine import TesseractLine, TesseractResult, TesseractWord
 
 
+def _blank_png(size: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Encoded once at import; the tests only need the pixels on disk, not a fresh Pillow round trip each time.
+_BLANK_PNG_200 = _blank_png(200)
+_BLANK_PNG_100 = _blank_png(100)
+
+# Processing only reads OCR results, so one empty result is safe to share between tests.
+_EMPTY_TESS_RESULT = TesseractResult(text="", lines=[])
+
+# Scripts and shared single-word geometry for the unicode round-trip cases.
+_UNICODE_SAMPLES: tuple[str, ...] = (
+    "Hello 世界",
+    "Привет мир",
+    "مرحبا العالم",
+    "שלום עולם",
+    "こんにちは世界",
+    "🚀🌟✨",
+    "Café résumé naïve",
+)
+_UNICODE_BOX: dict[str, int] = {"left": 10, "top": 10, "width": 50, "height": 20, "line_index": 0}
+
+
 class NormalizeSegmentsTests(unittest.TestCase):
     """Validate `_normalize_segments` behavior with diverse inputs."""
 
     def test_handles_empty_text(self) -> None:
-        tess_result = TesseractResult(text="", lines=[])
-        lines, tokens = _normalize_segments(tess_result, 100, 100)
+        lines, tokens = _normalize_segments(_EMPTY_TESS_RESULT, 100, 100)
         self.assertEqual(len(lines), 1)
         self.assertEqual(lines[0].text, "")
         self.assertEqual(len(lines[0].words), 0)
@@ -72,139 +98,115 @@ class NormalizeSegmentsTests(unittest.TestCase):
         self.assertEqual(len(line_segments), 0)
 
     def test_unicode_texts_preserved(self) -> None:
-        unicode_texts = [
-            "Hello 世界",
-            "Привет мир",
-            "مرحبا العالم",
-            "שלום עולם",
-            "こんにちは世界",
-            "🚀🌟✨",
-            "Café résumé naïve",
-        ]
-        for text in unicode_texts:
-            word = TesseractWord(text=text, left=10, top=10, width=50, height=20, line_index=0, word_index=0)
-            line = TesseractLine(text=text, left=10, top=10, width=50, height=20, line_index=0, words=[word])
-            tess_result = TesseractResult(text=text, lines=[line])
-            lines, tokens = _normalize_segments(tess_result, 200, 200)
-            self.assertEqual(len(lines), 1)
-            self.assertEqual(lines[0].text, text)
-            self.assertEqual(tokens[0].text, text)
+        for text in _UNICODE_SAMPLES:
+            with self.subTest(text=text):
+                word = TesseractWord(text=text, word_index=0, **_UNICODE_BOX)
+                line = TesseractLine(text=text, words=[word], **_UNICODE_BOX)
+                lines, tokens = _normalize_segments(TesseractResult(text=text, lines=[line]), 200, 200)
+                self.assertEqual(len(lines), 1)
+                self.assertEqual(lines[0].text, text)
+                self.assertEqual(tokens[0].text, text)
 
 
 class ProcessInputsIntegrationTests(unittest.TestCase):
     """Targeted tests around `process_inputs` edge behavior."""
 
-    temp_dir: tempfile.TemporaryDirectory[str] | None
-    data_root: Path | None
+    temp_path: ClassVar[Path]
+    data_root: ClassVar[Path]
+    run_tesseract: ClassVar[MagicMock]
 
-    def __init__(self, methodName: str = "runTest") -> None:
-        super().__init__(methodName)
-        self.temp_dir = None
-        self.data_root = None
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Every test uses its own project id and manuscript folder, so one temp tree and set of patches serve the class.
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.data_root = cls.temp_path / "data"
+        cls.data_root.mkdir(parents=True, exist_ok=True)
+        _ = cls.enterClassContext(patch("lekha.project.get_data_root", return_value=cls.data_root))
+        _ = cls.enterClassContext(patch("lekha.processing.validate_tesseract_installation"))
+        cls.run_tesseract = cls.enterClassContext(patch("lekha.processing._run_tesseract_with_logging"))
 
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        base = Path(self.temp_dir.name)
-        self.data_root = base / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        _ = patcher.start()
-        self.addCleanup(patcher.stop)
+        self.run_tesseract.reset_mock(return_value=True)
 
     def _make_store(self, project_id: str) -> ProjectStore:
-        assert self.data_root is not None
         return ProjectStore(project_id)
 
+    def _manuscript_dir(self) -> Path:
+        manuscript_dir = self.temp_path / self._testMethodName / "manuscript"
+        manuscript_dir.mkdir(parents=True)
+        return manuscript_dir
+
     def test_process_inputs_handles_blank_page(self) -> None:
-        assert self.temp_dir is not None
-        manuscript_dir = Path(self.temp_dir.name) / "manuscript"
-        manuscript_dir.mkdir()
+        manuscript_dir = self._manuscript_dir()
         blank_image = manuscript_dir / "blank.png"
-        Image.new("RGB", (200, 200), color="white").save(blank_image)
+        _ = blank_image.write_bytes(_BLANK_PNG_200)
 
         store = self._make_store("blank-page-test")
-        with patch("lekha.processing.validate_tesseract_installation"), patch(
-            "lekha.processing._run_tesseract_with_logging",
-            return_value=TesseractResult(text="", lines=[]),
-        ):
-            process_inputs(
-                source_paths=[blank_image],
-                languages=["eng"],
-                models=["tesseract"],
-                store=store,
-                source=str(blank_image),
-            )
+        self.run_tesseract.return_value = _EMPTY_TESS_RESULT
+        process_inputs(
+            source_paths=[blank_image],
+            languages=["eng"],
+            models=["tesseract"],
+            store=store,
+            source=str(blank_image),
+        )
         segments = store.load_segments()
         self.assertGreaterEqual(len(segments), 0)
 
     def test_process_inputs_handles_whitespace_only(self) -> None:
-        assert self.temp_dir is not None
-        manuscript_dir = Path(self.temp_dir.name) / "manuscript"
-        manuscript_dir.mkdir()
+        manuscript_dir = self._manuscript_dir()
         image_path = manuscript_dir / "whitespace.png"
-        Image.new("RGB", (200, 200), color="white").save(image_path)
+        _ = image_path.write_bytes(_BLANK_PNG_200)
 
         store = self._make_store("whitespace-test")
-        with patch("lekha.processing.validate_tesseract_installation"), patch(
-            "lekha.processing._run_tesseract_with_logging",
-            return_value=TesseractResult(text="   \n\n   ", lines=[]),
-        ):
-            process_inputs(
-                source_paths=[image_path],
-                languages=["eng"],
-                models=["tesseract"],
-                store=store,
-                source=str(image_path),
-            )
+        self.run_tesseract.return_value = TesseractResult(text="   \n\n   ", lines=[])
+        process_inputs(
+            source_paths=[image_path],
+            languages=["eng"],
+            models=["tesseract"],
+            store=store,
+            source=str(image_path),
+        )
         manifest = store.load_manifest()
         self.assertIsNotNone(manifest)
         assert manifest is not None
         self.assertEqual(len(manifest.files), 1)
 
     def test_process_inputs_fails_on_non_image(self) -> None:
-        assert self.temp_dir is not None
-        manuscript_dir = Path(self.temp_dir.name) / "manuscript"
-        manuscript_dir.mkdir()
+        manuscript_dir = self._manuscript_dir()
         fake_image = manuscript_dir / "fake.png"
         _ = fake_image.write_text("I am not an image", encoding="utf-8")
 
         store = self._make_store("invalid-image-test")
-        with patch("lekha.processing.validate_tesseract_installation"), patch(
-            "lekha.processing._run_tesseract_with_logging",
-            return_value=TesseractResult(text="", lines=[]),
-        ):
-            with self.assertRaises(Exception):
-                process_inputs(
-                    source_paths=[fake_image],
-                    languages=["eng"],
-                    models=["tesseract"],
-                    store=store,
-                    source=str(fake_image),
-                )
+        self.run_tesseract.return_value = _EMPTY_TESS_RESULT
+        with self.assertRaises(Exception):
+            process_inputs(
+                source_paths=[fake_image],
+                languages=["eng"],
+                models=["tesseract"],
+                store=store,
+                source=str(fake_image),
+            )
 
     def test_process_inputs_ignores_unsupported_extensions(self) -> None:
-        assert self.temp_dir is not None
-        manuscript_dir = Path(self.temp_dir.name) / "manuscript"
-        manuscript_dir.mkdir()
+        manuscript_dir = self._manuscript_dir()
         unsupported_file = manuscript_dir / "file.txt"
         _ = unsupported_file.write_text("text file", encoding="utf-8")
         valid_image = manuscript_dir / "valid.png"
-        Image.new("RGB", (100, 100), color="white").save(valid_image)
+        _ = valid_image.write_bytes(_BLANK_PNG_100)
 
         store = self._make_store("unsupported-ext-test")
-        with patch("lekha.processing.validate_tesseract_installation"), patch(
-            "lekha.processing._run_tesseract_with_logging",
-            return_value=TesseractResult(text="test", lines=[]),
-        ):
-            process_inputs(
-                source_paths=[valid_image],
-                languages=["eng"],
-                models=["tesseract"],
-                store=store,
-                source=str(manuscript_dir),
-            )
+        self.run_tesseract.return_value = TesseractResult(text="test", lines=[])
+        process_inputs(
+            source_paths=[valid_image],
+            languages=["eng"],
+            models=["tesseract"],
+            store=store,
+            source=str(manuscript_dir),
+        )
         self.assertTrue(store.meta_path.exists())
 
 
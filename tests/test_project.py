@@ -4,8 +4,8 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
-from typing import override
-from unittest.mock import patch
+from typing import ClassVar, cast, override
+from unittest.mock import MagicMock, patch
 
 from lekha.project import (
     ProjectManifest,
@@ -58,12 +58,18 @@ def _sample_segments() -> list[Segment]:
     return [line, word_one, word_two]
 
 
+_SAMPLE_SEGMENTS: tuple[Segment, ...] = tuple(_sample_segments())
+
+
 class ProjectUtilitiesTests(unittest.TestCase):
     def test_slugify_removes_invalid_characters(self) -> None:
         self.assertEqual(slugify("Hello, World!"), "hello-world")
         self.assertEqual(slugify("Already-clean"), "already-clean")
         self.assertEqual(slugify("123 456"), "123-456")
 
+    def test_slugify_keeps_unicode_letters_and_underscores(self) -> None:
+        self.assertEqual(slugify("Café_Notes — 漢字"), "café_notes-漢字")
+
     def test_project_id_for_path_is_deterministic(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             path = Path(tmp_dir) / "Some Project"
@@ -75,18 +81,22 @@ class ProjectUtilitiesTests(unittest.TestCase):
 
 
 class ProjectStoreTests(unittest.TestCase):
-    temp_dir: tempfile.TemporaryDirectory[str] | None = None
+    temp_path: ClassVar[Path]
+    get_data_root: ClassVar[MagicMock]
     data_root: Path | None = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.get_data_root = cls.enterClassContext(patch("lekha.project.get_data_root"))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        self.data_root = Path(self.temp_dir.name) / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        self.addCleanup(patcher.stop)
-        _ = patcher.start()
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        self.get_data_root.return_value = self.data_root
 
     def test_manifest_round_trip(self) -> None:
         store = ProjectStore("project-1")
@@ -103,11 +113,20 @@ class ProjectStoreTests(unittest.TestCase):
 
     def test_segments_round_trip(self) -> None:
         store = ProjectStore("project-2")
-        segments = list(_sample_segments())
+        segments = list(_SAMPLE_SEGMENTS)
         store.write_segments(segments)
         loaded = store.load_segments()
         self.assertEqual(loaded, segments)
 
+    def test_segment_sort_key_is_derived_not_persisted(self) -> None:
+        store = ProjectStore("project-2b")
+        segments = list(_SAMPLE_SEGMENTS)
+        self.assertEqual([seg.sort_key for seg in segments], [(0, 0, -1), (0, 0, 0), (0, 0, 1)])
+        store.write_segments(segments)
+        raw = cast(list[dict[str, object]], json.loads(store.segments_path.read_text(encoding="utf-8")))
+        self.assertTrue(all("sort_key" not in entry for entry in raw))
+        self.assertEqual(store.load_segments()[2].sort_key, (0, 0, 1))
+
     def test_read_edits_filters_non_strings(self) -> None:
         store = ProjectStore("project-3")
         _ = store.edits_path.write_text(json.dumps({"keep": "value", "skip": 123}), encoding="utf-8")
@@ -121,6 +140,80 @@ class ProjectStoreTests(unittest.TestCase):
         self.assertEqual(state["view"], "line")
         self.assertEqual(state["segment_id"], "")
 
+    def test_write_state_skips_unchanged_state(self) -> None:
+        store = ProjectStore("project-6")
+        store.write_state({"view": "line", "segment_id": "p000_l0000"})
+        _ = store.state_path.write_text("{}", encoding="utf-8")
+        store.write_state({"view": "line", "segment_id": "p000_l0000"})
+        self.assertEqual(store.state_path.read_text(encoding="utf-8"), "{}")
+        store.write_state({"view": "word", "segment_id": "p000_l0000_w0000"})
+        self.assertEqual(store.read_state()["view"], "word")
+
+    def test_write_edits_skips_unchanged_edits(self) -> None:
+        store = ProjectStore("project-7")
+        edits = {"p000_l0000": "hello"}
+        store.write_edits(edits)
+        _ = store.edits_path.write_text("{}", encoding="utf-8")
+        store.write_edits(edits)
+        self.assertEqual(store.read_edits(), {})
+        edits["p000_l0000"] = "changed"
+        store.write_edits(edits)
+        self.assertEqual(store.read_edits(), {"p000_l0000": "changed"})
+
+    def test_append_edits_replays_over_snapshot(self) -> None:
+        store = ProjectStore("project-8")
+        store.write_edits({"a": "one", "b": "two"})
+        store.append_edits({"b": "three"})
+        store.append_edits({"c": "four"})
+        self.assertEqual(store.read_edits(), {"a": "one", "b": "three", "c": "four"})
+
+    def test_read_edits_skips_torn_log_line(self) -> None:
+        store = ProjectStore("project-9")
+        store.append_edits({"a": "one"})
+        with store.edits_log_path.open("a", encoding="utf-8") as fh:
+            _ = fh.write('{"id": "b", "te')
+        self.assertEqual(store.read_edits(), {"a": "one"})
+
+    def test_append_after_torn_log_line_starts_a_new_line(self) -> None:
+        store = ProjectStore("project-15")
+        store.append_edits({"a": "one"})
+        # Cut the last entry inside a multibyte character, as a crash mid-append would.
+        torn = '{"id": "b", "text": "नमस्ते"}'.encode("utf-8")[:-4]
+        with store.edits_log_path.open("ab") as fh:
+            _ = fh.write(torn)
+        store.append_edits({"c": "three"})
+        self.assertEqual(store.read_edits(), {"a": "one", "c": "three"})
+        # The stdlib decoder reports the cut character as UnicodeDecodeError rather than JSONDecodeError.
+        with patch("lekha.project.orjson", None):
+            self.assertEqual(store.read_edits(), {"a": "one", "c": "three"})
+
+    def test_write_edits_after_append_supersedes_log(self) -> None:
+        store = ProjectStore("project-10")
+        store.write_edits({"a": "one"})
+        store.append_edits({"a": "two"})
+        store.write_edits({"a": "one"})
+        self.assertFalse(store.edits_log_path.exists())
+        self.assertEqual(store.read_edits(), {"a": "one"})
+
+    def test_append_edits_compacts_large_log(self) -> None:
+        store = ProjectStore("project-11")
+        with patch("lekha.project.EDITS_LOG_COMPACT_BYTES", 64):
+            store.append_edits({"a": "one"})
+            self.assertTrue(store.edits_log_path.exists())
+            store.append_edits({"b": "x" * 64})
+        self.assertFalse(store.edits_log_path.exists())
+        snapshot = cast(dict[str, str], json.loads(store.edits_path.read_text(encoding="utf-8")))
+        self.assertEqual(snapshot, {"a": "one", "b": "x" * 64})
+
+    def test_failed_write_keeps_previous_file(self) -> None:
+        store = ProjectStore("project-14")
+        store.write_state({"view": "line", "segment_id": "a"})
+        with patch("lekha.project.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.write_state({"view": "word", "segment_id": "b"})
+        self.assertEqual(store.read_state(), {"view": "line", "segment_id": "a"})
+        self.assertEqual([path.name for path in store.root.iterdir() if path.name.endswith(".tmp")], [])
+
     def test_write_master_creates_file(self) -> None:
         store = ProjectStore("project-5")
         store.write_master("hello world")
@@ -129,18 +222,22 @@ class ProjectStoreTests(unittest.TestCase):
 
 
 class CorruptedJSONTests(unittest.TestCase):
-    temp_dir: tempfile.TemporaryDirectory[str] | None = None
+    temp_path: ClassVar[Path]
+    get_data_root: ClassVar[MagicMock]
     data_root: Path | None = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.get_data_root = cls.enterClassContext(patch("lekha.project.get_data_root"))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        self.data_root = Path(self.temp_dir.name) / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        self.addCleanup(patcher.stop)
-        _ = patcher.start()
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        self.get_data_root.return_value = self.data_root
 
     def test_load_manifest_raises_on_invalid_json(self) -> None:
         store = ProjectStore("corrupt-1")
@@ -5,8 +5,8 @@ from __future__ import annotations
 import tempfile
 import unittest
 from pathlib import Path
-from typing import override
-from unittest.mock import patch
+from typing import ClassVar, override
+from unittest.mock import MagicMock, patch
 
 from lekha.project import ProjectStore, Segment
 from lekha.runtime.editor import SegmentEditor
@@ -54,34 +54,39 @@ def _sample_segments() -> list[Segment]:
     return [line_segment, word_one, word_two]
 
 
+_SAMPLE_SEGMENTS: tuple[Segment, ...] = tuple(_sample_segments())
+
+
 class SegmentEditorTests(unittest.TestCase):
     """Direct unit tests for `SegmentEditor` helper logic."""
 
-    temp_dir: tempfile.TemporaryDirectory[str] | None
+    temp_path: ClassVar[Path]
+    get_data_root: ClassVar[MagicMock]
     data_root: Path | None
     store: ProjectStore | None
     editor: SegmentEditor | None
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
-        self.temp_dir = None
         self.data_root = None
         self.store = None
         self.editor = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.get_data_root = cls.enterClassContext(patch("lekha.project.get_data_root"))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        base = Path(self.temp_dir.name)
-        self.data_root = base / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        _ = patcher.start()
-        self.addCleanup(patcher.stop)
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        self.get_data_root.return_value = self.data_root
 
         self.store = ProjectStore("editor-project")
-        segments = _sample_segments()
+        segments = list(_SAMPLE_SEGMENTS)
         self.store.write_segments(segments)
         orders = {
             "line": ["p000_l0000"],
@@ -103,6 +108,65 @@ class SegmentEditorTests(unittest.TestCase):
         master_text = self.store.master_path.read_text(encoding="utf-8")
         self.assertEqual(master_text.strip(), "alpha beta")
 
+    def test_save_line_folds_surplus_tokens_into_last_word(self) -> None:
+        assert self.editor is not None
+        assert self.store is not None
+        self.editor.save("p000_l0000", "line", "alpha beta gamma ")
+        edits = self.store.read_edits()
+        self.assertEqual(edits["p000_l0000_w0000"], "alpha")
+        self.assertEqual(edits["p000_l0000_w0001"], "beta gamma")
+
+    def test_save_line_single_spaces_surplus_whitespace(self) -> None:
+        assert self.editor is not None
+        assert self.store is not None
+        self.editor.save("p000_l0000", "line", "alpha beta\t\tgamma\nx")
+        edits = self.store.read_edits()
+        self.assertEqual(edits["p000_l0000_w0000"], "alpha")
+        self.assertEqual(edits["p000_l0000_w0001"], "beta gamma x")
+
+    def test_edit_recorded_during_append_is_kept_for_next_persist(self) -> None:
+        assert self.editor is not None
+        assert self.store is not None
+        editor = self.editor
+        append_edits = self.store.append_edits
+
+        def append_then_edit(changes: dict[str, str]) -> None:
+            append_edits(changes)
+            editor.save("p000_l0000_w0001", "word", "LATE", persist=False)
+
+        with patch.object(self.store, "append_edits", side_effect=append_then_edit):
+            editor.save("p000_l0000_w0000", "word", "EARLY")
+        editor.save("p000_l0000_w0000", "word", "EARLIER")
+        edits = self.store.read_edits()
+        self.assertEqual(edits["p000_l0000_w0000"], "EARLIER")
+        self.assertEqual(edits["p000_l0000_w0001"], "LATE")
+
+    def test_edit_recorded_during_flush_is_kept(self) -> None:
+        assert self.editor is not None
+        assert self.store is not None
+        editor = self.editor
+        write_edits_and_state = self.store.write_edits_and_state
+
+        def write_then_edit(changes: dict[str, str], state: dict[str, str]) -> None:
+            write_edits_and_state(changes, state)
+            editor.save("p000_l0000_w0001", "word", "LATE", persist=False)
+
+        editor.save("p000_l0000_w0000", "word", "EARLY", persist=False)
+        with patch.object(self.store, "write_edits_and_state", side_effect=write_then_edit):
+            editor.flush({"view": "word", "segment_id": "p000_l0000_w0000"})
+        editor.flush({"view": "word", "segment_id": "p000_l0000_w0001"})
+        edits = self.store.read_edits()
+        self.assertEqual(edits["p000_l0000_w0000"], "EARLY")
+        self.assertEqual(edits["p000_l0000_w0001"], "LATE")
+
+    def test_save_line_pads_missing_tokens(self) -> None:
+        assert self.editor is not None
+        assert self.store is not None
+        self.editor.save("p000_l0000", "line", "alpha")
+        edits = self.store.read_edits()
+        self.assertEqual(edits["p000_l0000_w0000"], "alpha")
+        self.assertEqual(edits["p000_l0000_w0001"], "")
+
     def test_save_word_updates_parent(self) -> None:
         assert self.editor is not None
         assert self.store is not None
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import io
 import tempfile
 import unittest
 from pathlib import Path
-from typing import override
-from unittest.mock import patch
+from typing import ClassVar, override
+from unittest.mock import MagicMock, patch
 
 from PIL import Image
 
@@ -43,39 +44,53 @@ def _segments() -> list[Segment]:
     return [line, word]
 
 
+_SAMPLE_SEGMENTS: tuple[Segment, ...] = tuple(_segments())
+
+
+def _encode_page() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (200, 200), color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+_PAGE_PNG = _encode_page()
+
+
 class ImageServiceTests(unittest.TestCase):
     """Direct unit tests for `ImageService` cropping and caching."""
 
-    temp_dir: tempfile.TemporaryDirectory[str] | None
+    temp_path: ClassVar[Path]
+    get_data_root: ClassVar[MagicMock]
     data_root: Path | None
     store: ProjectStore | None
     service: ImageService | None
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
-        self.temp_dir = None
         self.data_root = None
         self.store = None
         self.service = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.get_data_root = cls.enterClassContext(patch("lekha.project.get_data_root"))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        base = Path(self.temp_dir.name)
-        self.data_root = base / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        _ = patcher.start()
-        self.addCleanup(patcher.stop)
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        self.get_data_root.return_value = self.data_root
 
         self.store = ProjectStore("image-project")
-        segments = _segments()
+        segments = list(_SAMPLE_SEGMENTS)
         self.store.write_segments(segments)
         assert self.store.assets_dir.exists()
         # create image
         image_path = self.store.assets_dir / "page.png"
-        Image.new("RGB", (200, 200), color="white").save(image_path)
+        _ = image_path.write_bytes(_PAGE_PNG)
         segments_by_id = {segment.segment_id: segment for segment in segments}
         self.service = ImageService(self.store, segments_by_id)
 
@@ -93,6 +108,44 @@ class ImageServiceTests(unittest.TestCase):
         self.assertGreater(image.width, 0)
         self.assertGreater(image.height, 0)
 
+    def test_render_segment_image_reuses_encoded_bytes(self) -> None:
+        assert self.service is not None
+        segment = self.service.segments_by_id["p000_l0000_w0000"]
+        first = self.service.render_segment_image(segment)
+        second = self.service.render_segment_image(segment)
+        self.assertIs(first, second)
+        self.assertTrue(first.startswith(b"\x89PNG"))
+
+    def test_render_segment_image_evicts_least_recent(self) -> None:
+        assert self.service is not None
+        word = self.service.segments_by_id["p000_l0000_w0000"]
+        line = self.service.segments_by_id["p000_l0000"]
+        with patch("lekha.runtime.image_service.ENCODED_CACHE_SIZE", 1):
+            _ = self.service.render_segment_image(word)
+            _ = self.service.render_segment_image(line)
+        self.assertEqual(len(self.service.encoded_cache), 1)
+        self.assertEqual(next(iter(self.service.encoded_cache))[0], "p000_l0000")
+
+    def test_render_segment_image_encodes_webp(self) -> None:
+        assert self.service is not None
+        segment = self.service.segments_by_id["p000_l0000_w0000"]
+        data = self.service.render_segment_image(segment, fmt="webp")
+        self.assertEqual(data[:4], b"RIFF")
+        self.assertEqual(data[8:12], b"WEBP")
+        with self.assertRaises(ValueError):
+            _ = self.service.render_segment_image(segment, fmt="gif")
+
+    def test_raw_page_path_if_full_only_for_whole_page(self) -> None:
+        assert self.service is not None
+        assert self.store is not None
+        full = {"left": 0, "top": 0, "right": 200, "bottom": 200}
+        self.assertEqual(
+            self.service.raw_page_path_if_full("p000_l0000", full), self.store.assets_dir / "page.png"
+        )
+        self.assertIsNone(self.service.raw_page_path_if_full("p000_l0000", full, fmt="webp"))
+        crop = self.service.get_crop_bounds("p000_l0000")
+        self.assertIsNone(self.service.raw_page_path_if_full("p000_l0000", crop))
+
     def test_page_dimensions_cached(self) -> None:
         assert self.service is not None
         width, height = self.service._get_page_dimensions("page.png")  # pyright: ignore[reportPrivateUsage]
@@ -105,6 +158,19 @@ class ImageServiceTests(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             _ = self.service._get_page_dimensions("missing.png")  # pyright: ignore[reportPrivateUsage]
 
+    def test_page_dimensions_read_from_png_header(self) -> None:
+        assert self.service is not None
+        with patch("lekha.runtime.image_service.Image.open") as image_open:
+            dimensions = self.service._get_page_dimensions("page.png")  # pyright: ignore[reportPrivateUsage]
+        self.assertEqual(dimensions, (200, 200))
+        image_open.assert_not_called()
+
+    def test_page_dimensions_fall_back_to_pil_for_other_formats(self) -> None:
+        assert self.store is not None
+        assert self.service is not None
+        Image.new("RGB", (30, 40), color="white").save(self.store.assets_dir / "page.jpg")
+        self.assertEqual(self.service._get_page_dimensions("page.jpg"), (30, 40))  # pyright: ignore[reportPrivateUsage]
+
     def test_corrupted_image_raises(self) -> None:
         assert self.store is not None
         assert self.service is not None
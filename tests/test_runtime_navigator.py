@@ -5,8 +5,8 @@ from __future__ import annotations
 import tempfile
 import unittest
 from pathlib import Path
-from typing import override
-from unittest.mock import patch
+from typing import ClassVar, override
+from unittest.mock import MagicMock, patch
 
 from lekha.project import ProjectStore, Segment
 from lekha.runtime.navigator import SegmentNavigator
@@ -78,34 +78,39 @@ def _build_segments() -> list[Segment]:
     return [line_one, line_two, word_one_a, word_one_b, word_two_a]
 
 
+_SAMPLE_SEGMENTS: tuple[Segment, ...] = tuple(_build_segments())
+
+
 class SegmentNavigatorTests(unittest.TestCase):
     """Direct unit tests for `SegmentNavigator` traversal helpers."""
 
-    temp_dir: tempfile.TemporaryDirectory[str] | None
+    temp_path: ClassVar[Path]
+    get_data_root: ClassVar[MagicMock]
     data_root: Path | None
     store: ProjectStore | None
     navigator: SegmentNavigator | None
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
-        self.temp_dir = None
         self.data_root = None
         self.store = None
         self.navigator = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        cls.get_data_root = cls.enterClassContext(patch("lekha.project.get_data_root"))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        base = Path(self.temp_dir.name)
-        self.data_root = base / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
-        patcher = patch("lekha.project.get_data_root", return_value=self.data_root)
-        _ = patcher.start()
-        self.addCleanup(patcher.stop)
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        self.get_data_root.return_value = self.data_root
 
         self.store = ProjectStore("navigator-project")
-        segments = _build_segments()
+        segments = list(_SAMPLE_SEGMENTS)
         self.store.write_segments(segments)
         self.store.write_state({"view": "line", "segment_id": "p000_l0000"})
         orders = {
@@ -129,6 +134,12 @@ class SegmentNavigatorTests(unittest.TestCase):
         prev_line = self.navigator.navigate("line", "p000_l0001", "prev")
         self.assertEqual(prev_line, "p000_l0000")
 
+    def test_navigate_uses_replaced_order(self) -> None:
+        assert self.navigator is not None
+        self.assertEqual(self.navigator.navigate("line", "p000_l0000", "next"), "p000_l0001")
+        self.navigator.orders["line"] = ["p000_l0001", "p000_l0000"]
+        self.assertEqual(self.navigator.navigate("line", "p000_l0001", "next"), "p000_l0000")
+
     def test_next_issue_finds_conflict(self) -> None:
         assert self.navigator is not None
         issue = self.navigator.navigate("line", "p000_l0000", "next_issue")
@@ -137,6 +148,12 @@ class SegmentNavigatorTests(unittest.TestCase):
         self.navigator.edits["p000_l0001"] = "resolved"
         self.assertEqual(self.navigator.navigate("line", "p000_l0000", "next_issue"), "p000_l0000")
 
+    def test_next_issue_follows_replaced_order(self) -> None:
+        assert self.navigator is not None
+        self.assertEqual(self.navigator.navigate("word", "p000_l0000_w0000", "next_issue"), "p000_l0001_w0000")
+        self.navigator.orders["word"] = ["p000_l0000_w0000", "p000_l0000_w0001"]
+        self.assertEqual(self.navigator.navigate("word", "p000_l0000_w0000", "next_issue"), "p000_l0000_w0000")
+
     def test_switch_view_preserves_context(self) -> None:
         assert self.navigator is not None
         to_word = self.navigator.switch_view("p000_l0000", "word")
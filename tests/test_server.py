@@ -1,20 +1,20 @@
 from __future__ import annotations
 
+import io
+import json
 import os
 import tempfile
 import unittest
 from collections.abc import Sequence
 from pathlib import Path
-from typing import cast, override
-from unittest.mock import patch
-import warnings
+from typing import ClassVar, cast, override
+from unittest.mock import MagicMock, patch
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 
-from lekha.project import ProjectManifest, ProjectStore, Segment
-from lekha.server import ProjectRuntime, create_app, get_or_generate_secret_key
-
-warnings.simplefilter("ignore", ResourceWarning)
+from lekha import server as server_module
+from lekha.project import _SEGMENT_FIELDS, ProjectManifest, ProjectStore, Segment  # pyright: ignore[reportPrivateUsage]
+from lekha.server import ProjectRuntime, create_app, get_or_generate_secret_key, run_server
 
 
 def _runtime_segments() -> list[Segment]:
@@ -83,8 +83,22 @@ def _runtime_segments() -> list[Segment]:
     return [line_one, line_two, word_one_a, word_one_b, word_two_a]
 
 
+def _encode_page() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (80, 80), color="white").save(buffer, format="PNG", compress_level=0)
+    return buffer.getvalue()
+
+
+_SEGMENTS: tuple[Segment, ...] = tuple(_runtime_segments())
+_PAGE_PNG = _encode_page()
+# Serialized the way ProjectStore.write_segments lays it out, so setUp can drop it straight into segments.json.
+_SEGMENTS_JSON = json.dumps(
+    [{name: getattr(segment, name) for name in _SEGMENT_FIELDS} for segment in _SEGMENTS]
+).encode("utf-8")
+
+
 class ProjectRuntimeTests(unittest.TestCase):
-    temp_dir: tempfile.TemporaryDirectory[str] | None
+    temp_path: ClassVar[Path]
     data_root: Path | None
     project_id: str
     store: ProjectStore | None
@@ -93,33 +107,31 @@ class ProjectRuntimeTests(unittest.TestCase):
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
-        self.temp_dir = None
         self.data_root = None
         self.project_id = ""
         self.store = None
         self.segments = []
         self.runtime = None
 
+    @classmethod
+    @override
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.temp_path = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        _ = cls.enterClassContext(patch.dict(os.environ))
+
     @override
     def setUp(self) -> None:
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        self.data_root = Path(self.temp_dir.name) / "data"
-        self.data_root.mkdir(parents=True, exist_ok=True)
+        self.data_root = self.temp_path / self._testMethodName / "data"
+        self.data_root.mkdir(parents=True)
+        os.environ["LEKHA_DATA_ROOT"] = str(self.data_root)
         self.project_id = "runtime-project"
-        patcher_project = patch("lekha.project.get_data_root", return_value=self.data_root)
-        patcher_server = patch("lekha.server.get_data_root", return_value=self.data_root)
-        _ = patcher_project.start()
-        _ = patcher_server.start()
-        self.addCleanup(patcher_project.stop)
-        self.addCleanup(patcher_server.stop)
 
         self.store = ProjectStore(self.project_id)
-        # Create an image for crop calculations.
-        image_path = self.store.assets_dir / "page.png"
-        Image.new("RGB", (200, 200), color="white").save(image_path)
-        self.segments = list(_runtime_segments())
-        self.store.write_segments(self.segments)
+        # Page image for crop calculations.
+        _ = (self.store.assets_dir / "page.png").write_bytes(_PAGE_PNG)
+        self.segments = list(_SEGMENTS)
+        _ = self.store.segments_path.write_bytes(_SEGMENTS_JSON)
         self.store.write_manifest(
             ProjectManifest(
                 project_id=self.project_id,
@@ -187,6 +199,17 @@ class ProjectRuntimeTests(unittest.TestCase):
         self.assertEqual(persisted["view"], "word")
         self.assertEqual(persisted["segment_id"], target_word)
 
+    def test_save_and_navigate_persists_edits_and_state_together(self) -> None:
+        assert self.runtime is not None
+        assert self.store is not None
+        with patch.object(self.store, "write_edits_and_state", wraps=self.store.write_edits_and_state) as combined:
+            next_id = self.runtime.save_and_navigate("p000_l0000", "line", "alpha beta", "next")
+        self.assertEqual(next_id, "p000_l0001")
+        combined.assert_called_once()
+        self.assertEqual(self.store.read_edits()["p000_l0000"], "alpha beta")
+        self.assertEqual(self.store.read_state()["segment_id"], "p000_l0001")
+        self.assertIn("alpha beta", self.store.master_path.read_text(encoding="utf-8"))
+
     def test_ensure_state_corrects_invalid_values(self) -> None:
         assert self.runtime is not None
         assert self.store is not None
@@ -208,6 +231,14 @@ class ProjectRuntimeTests(unittest.TestCase):
         payload_after = self.runtime.segment_payload("p000_l0001")
         self.assertFalse(payload_after["has_conflict"])
 
+    def test_segment_payload_returns_independent_copies(self) -> None:
+        assert self.runtime is not None
+        payload = self.runtime.segment_payload("p000_l0000")
+        payload["view"] = "word"
+        self.assertEqual(self.runtime.segment_payload("p000_l0000")["view"], "line")
+        self.runtime.save("p000_l0000", "line", "fresh text")
+        self.assertEqual(self.runtime.segment_payload("p000_l0000")["text"], "fresh text")
+
     def test_crop_bounds_and_image_loading(self) -> None:
         assert self.runtime is not None
         bounds = self.runtime.get_crop_bounds("p000_l0000_w0000")
@@ -223,14 +254,14 @@ class ProjectRuntimeTests(unittest.TestCase):
         self.assertNotIn("page.png", self.runtime.image_service.page_dimensions)
         # First call loads dimensions (testing private method is acceptable in tests)
         width, height = self.runtime._get_page_dimensions("page.png")  # pyright: ignore[reportPrivateUsage]
-        self.assertEqual(width, 200)
-        self.assertEqual(height, 200)
+        self.assertEqual(width, 80)
+        self.assertEqual(height, 80)
         # Now cached
         self.assertIn("page.png", self.runtime.image_service.page_dimensions)
         # Second call uses cache
         width2, height2 = self.runtime._get_page_dimensions("page.png")  # pyright: ignore[reportPrivateUsage]
-        self.assertEqual(width2, 200)
-        self.assertEqual(height2, 200)
+        self.assertEqual(width2, 80)
+        self.assertEqual(height2, 80)
 
     def test_get_page_dimensions_raises_on_missing_file(self) -> None:
         assert self.runtime is not None
@@ -244,73 +275,233 @@ class ProjectRuntimeTests(unittest.TestCase):
         # Create a corrupted image file
         corrupted_path = self.store.assets_dir / "corrupted.png"
         _ = corrupted_path.write_text("not an image", encoding="utf-8")
-        with self.assertRaises(RuntimeError) as ctx:
+        bad_open = patch("lekha.runtime.image_service.Image.open", side_effect=UnidentifiedImageError("bad"))
+        with bad_open, self.assertRaises(RuntimeError) as ctx:
             _ = self.runtime._get_page_dimensions("corrupted.png")  # pyright: ignore[reportPrivateUsage]
         self.assertIn("Failed to load image dimensions", str(ctx.exception))
 
     def test_create_app_endpoints(self) -> None:
+        assert self.store is not None
+        with create_app(self.store).test_client() as client:
+            state_resp = client.get("/api/state")
+            self.assertEqual(state_resp.status_code, 200)
+            state_json = cast(dict[str, object], state_resp.get_json())
+            self.assertEqual(state_json["project_id"], self.project_id)
+
+            seg_resp = client.get("/api/segment/p000_l0000")
+            self.assertEqual(seg_resp.status_code, 200)
+            payload = cast(dict[str, object], seg_resp.get_json())
+            self.assertEqual(payload["segment_id"], "p000_l0000")
+
+            image_resp = client.get("/api/segment/p000_l0000_w0000/image")
+            self.assertEqual(image_resp.status_code, 200)
+            self.assertEqual(image_resp.mimetype, "image/png")
+            self.assertEqual(image_resp.headers["Cache-Control"], "private, max-age=3600, must-revalidate")
+            self.assertIsNotNone(image_resp.headers.get("ETag"))
+
+            save_resp = client.post(
+                "/api/save",
+                json={
+                    "segment_id": "p000_l0000",
+                    "view": "line",
+                    "text": "gamma delta",
+                    "action": "save",
+                },
+            )
+            self.assertEqual(save_resp.status_code, 200)
+            save_json = cast(dict[str, object], save_resp.get_json())
+            self.assertEqual(save_json["view"], "line")
+            self.assertEqual(save_json["segment_id"], "p000_l0000")
+
+            view_resp = client.post("/api/view", json={"segment_id": "p000_l0000", "view": "word"})
+            self.assertEqual(view_resp.status_code, 200)
+            view_json = cast(dict[str, object], view_resp.get_json())
+            self.assertEqual(view_json["view"], "word")
+
+            projects_resp = client.get("/api/projects")
+            self.assertEqual(projects_resp.status_code, 200)
+            projects_payload = cast(dict[str, object], projects_resp.get_json())
+            projects = cast(Sequence[dict[str, object]], projects_payload["projects"])
+            project_ids = {cast(str, item["project_id"]) for item in projects}
+            self.assertIn(self.project_id, project_ids)
+            self.assertIn("zeta-project", project_ids)
+
+            project_resp = client.post("/api/project", json={"project_id": self.project_id})
+            self.assertEqual(project_resp.status_code, 200)
+            project_json = cast(dict[str, object], project_resp.get_json())
+            self.assertEqual(project_json["project_id"], self.project_id)
+
+            export_resp = client.get("/api/export/master")
+            self.assertEqual(export_resp.status_code, 200)
+            self.assertEqual(export_resp.mimetype, "text/plain")
+
+    def test_segment_image_honors_if_none_match(self) -> None:
         assert self.store is not None
         app = create_app(self.store)
         client = app.test_client()
 
-        state_resp = client.get("/api/state")
-        self.assertEqual(state_resp.status_code, 200)
-        state_json = cast(dict[str, object], state_resp.get_json())
-        self.assertEqual(state_json["project_id"], self.project_id)
-        state_resp.close()
+        first = client.get("/api/segment/p000_l0000_w0000/image")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        first.close()
+
+        with patch("lekha.runtime.image_service.ImageService.render_segment_image") as render:
+            cached = client.get("/api/segment/p000_l0000_w0000/image", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.get_data(), b"")
+        self.assertEqual(cached.headers["ETag"], etag)
+        render.assert_not_called()
+        cached.close()
+
+        other = client.get("/api/segment/p000_l0000/image", headers={"If-None-Match": etag})
+        self.assertEqual(other.status_code, 200)
+        self.assertNotEqual(other.headers["ETag"], etag)
+        other.close()
+
+    def test_segment_image_sends_full_page_file_directly(self) -> None:
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
+        page_path = self.store.assets_dir / "page.png"
+
+        with patch("lekha.runtime.image_service.ImageService.raw_page_path_if_full", return_value=page_path), patch(
+            "lekha.runtime.image_service.ImageService.render_segment_image"
+        ) as render:
+            resp = client.get("/api/segment/p000_l0000/image")
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.get_data(), page_path.read_bytes())
+            self.assertIn("ETag", resp.headers)
+            resp.close()
+        render.assert_not_called()
+
+    def test_segment_image_serves_webp(self) -> None:
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
 
-        seg_resp = client.get("/api/segment/p000_l0000")
-        self.assertEqual(seg_resp.status_code, 200)
-        payload = cast(dict[str, object], seg_resp.get_json())
-        self.assertEqual(payload["segment_id"], "p000_l0000")
-        seg_resp.close()
+        png_resp = client.get("/api/segment/p000_l0000_w0000/image")
+        webp_resp = client.get("/api/segment/p000_l0000_w0000/image?fmt=webp")
+        self.assertEqual(webp_resp.status_code, 200)
+        self.assertEqual(webp_resp.mimetype, "image/webp")
+        self.assertEqual(webp_resp.get_data()[8:12], b"WEBP")
+        self.assertNotEqual(webp_resp.headers["ETag"], png_resp.headers["ETag"])
+        png_resp.close()
+        webp_resp.close()
 
-        image_resp = client.get("/api/segment/p000_l0000_w0000/image")
-        self.assertEqual(image_resp.status_code, 200)
-        self.assertEqual(image_resp.mimetype, "image/png")
-        self.assertEqual(image_resp.headers["Cache-Control"], "no-store, no-cache, must-revalidate, max-age=0")
-        image_resp.close()
+        bad_resp = client.get("/api/segment/p000_l0000_w0000/image?fmt=gif")
+        self.assertEqual(bad_resp.status_code, 400)
+        bad_resp.close()
 
-        save_resp = client.post(
-            "/api/save",
-            json={
-                "segment_id": "p000_l0000",
-                "view": "line",
-                "text": "gamma delta",
-                "action": "save",
-            },
+    def test_session_cookie_only_sent_when_project_changes(self) -> None:
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
+
+        first = client.get("/api/state")
+        self.assertIn("Set-Cookie", first.headers)
+        first.close()
+        second = client.get("/api/state")
+        self.assertNotIn("Set-Cookie", second.headers)
+        second.close()
+
+    def test_state_negotiates_msgpack_when_available(self) -> None:
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
+        fake_msgpack = MagicMock()
+        fake_msgpack.packb.return_value = b"\x81packed"
+        headers = {"Accept": "application/msgpack"}
+
+        with patch("lekha.server.msgpack", fake_msgpack):
+            packed = client.get("/api/state", headers=headers)
+        self.assertEqual(packed.mimetype, "application/msgpack")
+        self.assertEqual(packed.get_data(), b"\x81packed")
+        self.assertIn("Accept", packed.headers["Vary"])
+        packed.close()
+
+        with patch("lekha.server.msgpack", None):
+            fallback = client.get("/api/state", headers=headers)
+        self.assertEqual(fallback.mimetype, "application/json")
+        self.assertIn("Accept", fallback.headers["Vary"])
+        fallback.close()
+
+    def test_list_projects_picks_up_new_projects(self) -> None:
+        assert self.store is not None
+        assert self.data_root is not None
+        app = create_app(self.store)
+        client = app.test_client()
+
+        first = client.get("/api/projects")
+        first_payload = cast(dict[str, object], first.get_json())
+        first_projects = cast(Sequence[dict[str, object]], first_payload["projects"])
+        first_ids = {cast(str, item["project_id"]) for item in first_projects}
+        self.assertNotIn("alpha-project", first_ids)
+        first.close()
+
+        new_project_dir = self.data_root / "alpha-project"
+        new_project_dir.mkdir()
+        _ = (new_project_dir / "manifest.json").write_text(
+            '{"project_id": "alpha-project", "source": "alpha"}', encoding="utf-8"
         )
-        self.assertEqual(save_resp.status_code, 200)
-        save_json = cast(dict[str, object], save_resp.get_json())
-        self.assertEqual(save_json["view"], "line")
-        self.assertEqual(save_json["segment_id"], "p000_l0000")
-        save_resp.close()
-
-        view_resp = client.post("/api/view", json={"segment_id": "p000_l0000", "view": "word"})
-        self.assertEqual(view_resp.status_code, 200)
-        view_json = cast(dict[str, object], view_resp.get_json())
-        self.assertEqual(view_json["view"], "word")
-        view_resp.close()
-
-        projects_resp = client.get("/api/projects")
-        self.assertEqual(projects_resp.status_code, 200)
-        projects_payload = cast(dict[str, object], projects_resp.get_json())
-        projects = cast(Sequence[dict[str, object]], projects_payload["projects"])
-        project_ids = {cast(str, item["project_id"]) for item in projects}
-        self.assertIn(self.project_id, project_ids)
-        self.assertIn("zeta-project", project_ids)
-        projects_resp.close()
-
-        project_resp = client.post("/api/project", json={"project_id": self.project_id})
-        self.assertEqual(project_resp.status_code, 200)
-        project_json = cast(dict[str, object], project_resp.get_json())
-        self.assertEqual(project_json["project_id"], self.project_id)
-        project_resp.close()
-
-        export_resp = client.get("/api/export/master")
-        self.assertEqual(export_resp.status_code, 200)
-        self.assertEqual(export_resp.mimetype, "text/plain")
-        export_resp.close()
+
+        second = client.get("/api/projects")
+        second_payload = cast(dict[str, object], second.get_json())
+        labels = [cast(str, item["label"]) for item in cast(Sequence[dict[str, object]], second_payload["projects"])]
+        self.assertEqual(labels, ["alpha", "source.pdf", "zeta"])
+        second.close()
+
+    def test_list_projects_reloads_rewritten_manifest(self) -> None:
+        assert self.store is not None
+        assert self.data_root is not None
+        app = create_app(self.store)
+        client = app.test_client()
+        first = client.get("/api/projects")
+        first_payload = cast(dict[str, object], first.get_json())
+        first_projects = cast(Sequence[dict[str, object]], first_payload["projects"])
+        first_labels = [cast(str, item["label"]) for item in first_projects]
+        self.assertIn("zeta", first_labels)
+        first.close()
+
+        _ = (self.data_root / "zeta-project" / "manifest.json").write_text(
+            '{"project_id": "zeta-project", "source": "zeta renamed"}', encoding="utf-8"
+        )
+        second = client.get("/api/projects")
+        second_payload = cast(dict[str, object], second.get_json())
+        second_projects = cast(Sequence[dict[str, object]], second_payload["projects"])
+        second_labels = [cast(str, item["label"]) for item in second_projects]
+        self.assertIn("zeta renamed", second_labels)
+        self.assertNotIn("zeta", second_labels)
+        second.close()
+
+    def test_runtime_cache_evicts_least_recent_project(self) -> None:
+        other_store = ProjectStore("beta-project")
+        _ = (other_store.assets_dir / "page.png").write_bytes(_PAGE_PNG)
+        _ = other_store.segments_path.write_bytes(_SEGMENTS_JSON)
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
+
+        with patch("lekha.server.RUNTIME_CACHE_SIZE", 1), patch(
+            "lekha.server.ProjectRuntime", wraps=ProjectRuntime
+        ) as runtime_cls:
+            for project_id in ("beta-project", self.project_id):
+                resp = client.post("/api/project", json={"project_id": project_id})
+                self.assertEqual(resp.status_code, 200)
+                resp.close()
+        # Returning to the default project has to reload it once beta pushed it out.
+        self.assertEqual(runtime_cls.call_count, 2)
+
+    def test_post_endpoints_reject_malformed_json(self) -> None:
+        assert self.store is not None
+        app = create_app(self.store)
+        client = app.test_client()
+        for endpoint in ("/api/save", "/api/view", "/api/project"):
+            resp = client.post(endpoint, data="{not json", content_type="application/json")
+            self.assertEqual(resp.status_code, 400, endpoint)
+            resp.close()
+            resp = client.post(endpoint, json=["not", "a", "dict"])
+            self.assertEqual(resp.status_code, 400, endpoint)
+            resp.close()
 
     def test_missing_image_file_returns_404(self) -> None:
         assert self.store is not None
@@ -336,7 +527,8 @@ class ProjectRuntimeTests(unittest.TestCase):
         app = create_app(self.store)
         client = app.test_client()
 
-        image_resp = client.get("/api/segment/p000_l0000_w0000/image")
+        with patch("lekha.runtime.image_service.Image.open", side_effect=UnidentifiedImageError("bad")):
+            image_resp = client.get("/api/segment/p000_l0000_w0000/image")
         self.assertEqual(image_resp.status_code, 500)
         response_text = image_resp.get_data(as_text=True)
         # Should have a meaningful error message (could be from dimension loading or image loading)
@@ -347,7 +539,30 @@ class ProjectRuntimeTests(unittest.TestCase):
         image_resp.close()
 
 
+class JSONProviderTests(unittest.TestCase):
+    @unittest.skipIf(server_module.orjson is None, "orjson is not installed")
+    def test_orjson_provider_round_trips_payloads(self) -> None:
+        app = MagicMock()
+        provider = server_module.OrjsonProvider(app)
+        payload = {"b": [1, 2], "a": {"nested": True}, "text": "नमस्ते"}
+        encoded = provider.dumps(payload)
+        self.assertTrue(encoded.startswith('{"a"'))
+        self.assertEqual(provider.loads(encoded), payload)
+
+
+class RunServerTests(unittest.TestCase):
+    def test_run_server_uses_threaded_werkzeug_server(self) -> None:
+        app = MagicMock()
+        run_server(app, port=9000)
+        app.run.assert_called_once_with(host="127.0.0.1", port=9000, debug=False, threaded=True)  # pyright: ignore[reportAny]
+
+
 class SecretKeyTests(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        _ = self.enterContext(patch.dict(os.environ))
+        _ = os.environ.pop("LEKHA_WEB_SECRET", None)
+
     def test_get_or_generate_secret_key_with_custom_env(self) -> None:
         with patch.dict(os.environ, {"LEKHA_WEB_SECRET": "custom-secret-key"}, clear=False):
             key = get_or_generate_secret_key()
@@ -366,17 +581,23 @@ class SecretKeyTests(unittest.TestCase):
             self.assertIn("default secret key", str(args[0]))
 
     def test_get_or_generate_secret_key_generates_if_not_set(self) -> None:
-        with patch.dict(os.environ, {}, clear=True):
-            key = get_or_generate_secret_key()
-            # Should be a hex string of length 64 (32 bytes as hex)
-            self.assertEqual(len(key), 64)
-            self.assertTrue(all(c in "0123456789abcdef" for c in key))
-
-    def test_generated_keys_are_unique(self) -> None:
-        with patch.dict(os.environ, {}, clear=True):
+        key = get_or_generate_secret_key()
+        # Should be 32 random bytes as lowercase hex; fromhex rejects anything else.
+        self.assertEqual(len(key), 64)
+        self.assertEqual(len(bytes.fromhex(key)), 32)
+        self.assertEqual(key, key.lower())
+
+    def test_generated_key_is_reused_within_process(self) -> None:
+        key1 = get_or_generate_secret_key()
+        key2 = get_or_generate_secret_key()
+        self.assertEqual(key1, key2)
+
+    def test_generated_keys_are_unique_per_process(self) -> None:
+        with patch("lekha.server._generated_key", None):
             key1 = get_or_generate_secret_key()
+        with patch("lekha.server._generated_key", None):
             key2 = get_or_generate_secret_key()
-            self.assertNotEqual(key1, key2)
+        self.assertNotEqual(key1, key2)
 
 
 class MissingAssetsTests(unittest.TestCase):
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+def packb(
+    o: object,
+    *,
+    default: Callable[[object], object] | None = ...,
+    use_single_float: bool = ...,
+    use_bin_type: bool = ...,
+    strict_types: bool = ...,
+    datetime: bool = ...,
+    unicode_errors: str | None = ...,
+) -> bytes: ...
+def unpackb(
+    packed: bytes,
+    *,
+    raw: bool = ...,
+    use_list: bool = ...,
+    strict_map_key: bool = ...,
+) -> object: ...